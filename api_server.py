@@ -0,0 +1,285 @@
+"""
+Async HTTP API for programmatic lead enrichment (e.g. from a CRM).
+
+Run with:
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+
+Single leads are enriched inline (POST /v1/enrich); bulk uploads become jobs (POST /v1/jobs)
+that can be polled (GET /v1/jobs/{job_id}) or reported to a webhook when done.
+Single leads are scheduled as interactive, so they start ahead of queued job leads.
+All requests share one process, so company profiles, circuit breakers and HTTP connection pools are shared.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import ipaddress
+import urllib3
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
+from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from enrichment_engine import comprehensive_lead_enrichment
+from batch_preprocessing import preprocess_leads
+from circuit_breaker import breaker_states
+from scheduler import SlotScheduler, scheduler_states, schedule_class_for, INTERACTIVE
+
+# Enrichments running at once (each fans out to several provider calls)
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "8"))
+# Leads accepted but not finished before new work is refused with 429
+API_MAX_PENDING = int(os.getenv("API_MAX_PENDING", "1000"))
+# Seconds finished jobs stay available for polling
+API_JOB_RETENTION = int(os.getenv("API_JOB_RETENTION", str(24 * 3600)))
+# Optional shared secret expected in the X-API-Key header
+API_SERVICE_KEY = os.getenv("API_SERVICE_KEY", "")
+# Webhooks to private/loopback/link-local addresses are refused (SSRF) unless explicitly allowed
+API_WEBHOOK_ALLOW_PRIVATE = os.getenv("API_WEBHOOK_ALLOW_PRIVATE", "false").lower() in ("1", "true", "yes")
+
+app = FastAPI(title="AI Lead Enrichment API", version="1.0")
+
+_executor = ThreadPoolExecutor(max_workers=API_MAX_CONCURRENCY, thread_name_prefix="enrich")
+# Admits leads to the worker pool by weighted fair queuing instead of the executor's FIFO queue
+_enrich_slots = SlotScheduler("api_enrichments", API_MAX_CONCURRENCY)
+_jobs: Dict[str, Dict[str, Any]] = {}
+_pending = 0
+
+
+class Lead(BaseModel):
+    name: str = Field(..., min_length=1)
+    email: Optional[str] = None
+    company: Optional[str] = None
+    domain: Optional[str] = None
+    priority: str = "normal"
+
+
+class BulkRequest(BaseModel):
+    leads: List[Lead] = Field(..., min_length=1)
+    webhook_url: Optional[str] = None
+
+
+def _check_api_key(x_api_key: Optional[str] = Header(None)) -> None:
+    if API_SERVICE_KEY and x_api_key != API_SERVICE_KEY:
+        raise HTTPException(status_code=401, detail="Invalid or missing X-API-Key")
+
+
+def _reserve(count: int) -> None:
+    """Backpressure: refuse work that would push pending leads past API_MAX_PENDING"""
+    global _pending
+    if _pending + count > API_MAX_PENDING:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy: {_pending} leads pending (limit {API_MAX_PENDING})",
+            headers={"Retry-After": "30"},
+        )
+    _pending += count
+
+
+def _release(count: int = 1) -> None:
+    global _pending
+    _pending -= count
+
+
+async def _enrich(lead: Dict[str, Any], user: Optional[str], schedule_class: Optional[str] = None) -> Dict[str, Any]:
+    """Run one enrichment on the bounded worker pool once the scheduler admits it"""
+    loop = asyncio.get_running_loop()
+    schedule_class = schedule_class or schedule_class_for(lead.get("priority"))
+    try:
+        await _enrich_slots.acquire_async(schedule_class)
+    except asyncio.CancelledError:
+        _release()
+        raise
+    try:
+        return await loop.run_in_executor(
+            _executor,
+            lambda: comprehensive_lead_enrichment(
+                name=lead["name"],
+                email=lead.get("email") or None,
+                company=lead.get("company") or None,
+                domain=lead.get("domain") or None,
+                priority=lead.get("priority") or "normal",
+                user=user,
+                schedule_class=schedule_class
+            )
+        )
+    except Exception as e:
+        print(f"❌ API enrichment error: {e}")
+        return {"error": str(e), "lead_name": lead["name"]}
+    finally:
+        _enrich_slots.release()
+        _release()
+
+
+def _resolve_webhook(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (public address to deliver to, None), or (None, why `url` may not receive a webhook).
+    The address is None without an error when private targets are allowed.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return None, "webhook_url must be an absolute http(s) URL"
+    if API_WEBHOOK_ALLOW_PRIVATE:
+        return None, None
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = [info[4][0] for info in socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)]
+    except (socket.gaierror, UnicodeError, ValueError):
+        return None, f"webhook host {parsed.hostname} does not resolve"
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            return None, f"webhook host {parsed.hostname} resolves to a non-public address"
+    return addresses[0], None
+
+
+def _webhook_url_error(url: str) -> Optional[str]:
+    """Why `url` may not receive a webhook, or None when it's a public http(s) endpoint"""
+    return _resolve_webhook(url)[1]
+
+
+def _post_pinned(url: str, address: str, payload: Dict[str, Any]) -> int:
+    """
+    POST to the already-validated `address` rather than letting the HTTP client resolve the host again
+    (a DNS-rebinding host could answer with an internal address the second time).
+    The Host header, TLS SNI and certificate check still use the URL's hostname.
+    """
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    if parsed.scheme == "https":
+        pool = urllib3.HTTPSConnectionPool(
+            address, port, server_hostname=parsed.hostname, assert_hostname=parsed.hostname,
+            cert_reqs="CERT_REQUIRED", ca_certs=requests.certs.where(),
+        )
+    else:
+        pool = urllib3.HTTPConnectionPool(address, port)
+    with pool:
+        response = pool.urlopen(
+            "POST",
+            (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else ""),
+            body=json.dumps(payload).encode("utf-8"),
+            headers={"Host": parsed.netloc.rsplit("@", 1)[-1], "Content-Type": "application/json"},
+            redirect=False,  # A public endpoint could otherwise bounce the results to an internal one
+            retries=False,
+            timeout=30,
+        )
+    return response.status
+
+
+def _post_webhook(url: str, payload: Dict[str, Any]) -> None:
+    # Re-checked at send time: the host may resolve differently than when the job was created
+    address, error = _resolve_webhook(url)
+    if error:
+        print(f"❌ Webhook {url} refused: {error}")
+        return
+    try:
+        if address:
+            status = _post_pinned(url, address, payload)
+        else:
+            status = requests.post(url, json=payload, timeout=30, allow_redirects=False).status_code
+        print(f"📮 Webhook {url}: HTTP {status}")
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+        print(f"❌ Webhook {url} failed: {e}")
+
+
+async def _run_job(job: Dict[str, Any], leads: List[Dict[str, Any]], webhook_url: Optional[str]) -> None:
+    job["status"] = "running"
+
+    async def run(index: int, lead: Dict[str, Any]) -> None:
+        job["results"][index] = await _enrich(lead, job["user"])
+        job["completed"] += 1
+
+    await asyncio.gather(*(run(index, lead) for index, lead in enumerate(leads)))
+    job["status"] = "completed"
+    job["finished_at"] = time.time()
+    print(f"✅ API job {job['job_id']} completed: {job['completed']} leads")
+    # Free the results once retention passes even if nobody calls the API again
+    asyncio.get_running_loop().call_later(API_JOB_RETENTION + 1, _expire_jobs)
+
+    if webhook_url:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _post_webhook, webhook_url, _job_view(job, include_results=True))
+
+
+def _job_view(job: Dict[str, Any], include_results: bool) -> Dict[str, Any]:
+    view = {key: value for key, value in job.items() if key not in ("results", "task")}
+    if include_results:
+        view["results"] = job["results"]
+    return view
+
+
+def _expire_jobs() -> None:
+    """Drop finished jobs (and their results) older than API_JOB_RETENTION"""
+    cutoff = time.time() - API_JOB_RETENTION
+    for job_id in [job_id for job_id, job in _jobs.items() if job.get("finished_at") and job["finished_at"] < cutoff]:
+        del _jobs[job_id]
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    _expire_jobs()
+    return {
+        "status": "ok",
+        "pending_leads": _pending,
+        "max_pending": API_MAX_PENDING,
+        "max_concurrency": API_MAX_CONCURRENCY,
+        "active_jobs": sum(1 for job in _jobs.values() if job["status"] != "completed"),
+        "providers": breaker_states(),
+        "scheduler": {"enrichments": _enrich_slots.snapshot(), **scheduler_states()},
+    }
+
+
+@app.post("/v1/enrich", dependencies=[Depends(_check_api_key)])
+async def enrich_lead(lead: Lead, x_user: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Enrich one lead and return the full profile"""
+    _reserve(1)
+    return await _enrich(lead.model_dump(), x_user, INTERACTIVE)
+
+
+@app.post("/v1/jobs", status_code=202, dependencies=[Depends(_check_api_key)])
+async def create_job(request: BulkRequest, x_user: Optional[str] = Header(None)) -> JSONResponse:
+    """Queue a bulk enrichment; poll the status URL or wait for the webhook"""
+    _expire_jobs()
+    if request.webhook_url:
+        loop = asyncio.get_running_loop()
+        webhook_error = await loop.run_in_executor(None, _webhook_url_error, request.webhook_url)
+        if webhook_error:
+            raise HTTPException(status_code=422, detail=webhook_error)
+    accepted, rejected, report = preprocess_leads(pd.DataFrame([lead.model_dump() for lead in request.leads]))
+    leads = accepted.to_dict("records")
+    if not leads:
+        raise HTTPException(status_code=422, detail={"message": "No valid leads", "prevalidation": report})
+    _reserve(len(leads))
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "status": "queued",
+        "user": x_user,
+        "total": len(leads),
+        "completed": 0,
+        "created_at": time.time(),
+        "finished_at": None,
+        "prevalidation": report,
+        "rejected": rejected.to_dict("records"),
+        "results": [None] * len(leads),
+    }
+    _jobs[job_id] = job
+    job["task"] = asyncio.create_task(_run_job(job, leads, request.webhook_url))
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status_url": f"/v1/jobs/{job_id}", **_job_view(job, include_results=False)},
+    )
+
+
+@app.get("/v1/jobs/{job_id}", dependencies=[Depends(_check_api_key)])
+async def get_job(job_id: str, include_results: bool = True) -> Dict[str, Any]:
+    _expire_jobs()
+    job = _jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_view(job, include_results=include_results)
@@ -0,0 +1,71 @@
+import os
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from batch_preprocessing import preprocess_leads
+from enrichment_engine import comprehensive_lead_enrichment
+from result_export import ResultExporter
+from profiling import profiled
+
+# Concurrent enrichments per batch (each one fans out to several provider calls)
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
+
+def load_leads_file(file) -> pd.DataFrame:
+    """Read an uploaded CSV of leads as strings (no type guessing on emails/zip codes)"""
+    return pd.read_csv(file, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+
+def prepare_batch(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """Validate and normalize an upload before any network call"""
+    accepted, rejected, report = preprocess_leads(raw)
+    print(f"🧹 Pre-validation: {report['accepted_rows']}/{report['total_rows']} leads accepted")
+    return accepted, rejected, report
+
+
+@profiled("batch")
+def run_batch_enrichment(
+    leads: pd.DataFrame,
+    max_workers: int = BATCH_MAX_WORKERS,
+    user: Optional[str] = None,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    exporter: Optional[ResultExporter] = None
+) -> List[Dict[str, Any]]:
+    """
+    Enrich pre-validated leads concurrently.
+    Results come back in input order; `on_result(index, result)` fires as each lead finishes.
+    With an `exporter`, each result is also written to Parquet/CSV as it completes.
+    Profiled as one run (covering every worker thread) when ENABLE_PROFILING is set.
+    """
+    records = leads.to_dict("records")
+    results: List[Dict[str, Any]] = [{} for _ in records]
+    print(f"📦 Starting batch enrichment of {len(records)} leads ({max_workers} workers)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                comprehensive_lead_enrichment,
+                name=lead["name"],
+                email=lead.get("email") or None,
+                company=lead.get("company") or None,
+                domain=lead.get("domain") or None,
+                priority=lead.get("priority") or "normal",
+                user=user
+            ): index
+            for index, lead in enumerate(records)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ Batch lead {index + 1} error: {e}")
+                result = {"error": str(e), "lead_name": records[index]["name"]}
+            results[index] = result
+            if exporter:
+                exporter.add(result, records[index], index)
+            if on_result:
+                on_result(index, result)
+
+    print(f"✅ Batch enrichment completed: {len(records)} leads")
+    return results
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Consecutive failures before a provider's circuit opens
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# Seconds an open circuit waits before letting a half-open trial request through
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "60"))
+# Concurrent trial requests allowed while half-open
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# HTTP statuses meaning our key is exhausted, throttled or rejected - retrying per lead won't help
+QUOTA_STATUS_CODES = frozenset({401, 402, 403, 429})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider} circuit open - call skipped (retry in {retry_in:.0f}s)")
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    Opens after consecutive failures (or immediately on a quota error), short-circuits calls while open,
+    then lets a limited number of half-open trial requests decide whether to close again.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+        half_open_max_calls: int = CIRCUIT_HALF_OPEN_MAX_CALLS,
+    ):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+        self.short_circuited = 0
+        self.times_opened = 0
+        self._half_open_calls = 0
+        self._trial_round = 0  # Bumped on every OPEN -> HALF_OPEN transition
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Optional[int]:
+        """
+        Raise CircuitOpenError if the call must be skipped.
+        Returns a trial token when the call is a half-open trial - pass it to end_trial() once the call is over.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                elapsed = time.time() - self.opened_at
+                if elapsed < self.recovery_timeout:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(self.provider, self.recovery_timeout - elapsed)
+                self.state = HALF_OPEN
+                self._half_open_calls = 0
+                self._trial_round += 1
+                print(f"🟡 {self.provider} circuit half-open - sending trial request")
+            if self.state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(self.provider, 0)
+                self._half_open_calls += 1
+                return self._trial_round
+            return None
+
+    def end_trial(self, trial: Optional[int]) -> None:
+        """Free a half-open trial slot whose call ended without a recorded outcome (e.g. an unexpected exception)"""
+        with self._lock:
+            if trial is not None and self.state == HALF_OPEN and trial == self._trial_round and self._half_open_calls:
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        """Close from half-open; while open, late successes of calls started earlier are ignored"""
+        with self._lock:
+            if self.state == OPEN:
+                return
+            if self.state == HALF_OPEN:
+                print(f"🟢 {self.provider} circuit closed - provider recovered")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self, error: str = "", quota: bool = False) -> None:
+        """
+        Count a failed call; quota/auth errors open the circuit straight away.
+        While open, late failures of calls started earlier don't push recovery back.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == OPEN:
+                return
+            if self.state == HALF_OPEN or quota or self.consecutive_failures >= self.failure_threshold:
+                self.times_opened += 1
+                print(f"🔴 {self.provider} circuit open after {self.consecutive_failures} failure(s): {error}")
+                self.state = OPEN
+                self.opened_at = time.time()
+                self._half_open_calls = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(self.recovery_timeout - (time.time() - self.opened_at), 0) if self.state == OPEN else 0
+            return {
+                "provider": self.provider,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+                "retry_in_seconds": round(retry_in),
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Process-wide breaker for `provider`"""
+    with _registry_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.provider: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+
+# How long a company profile is reused before it is rebuilt (seconds)
+COMPANY_PROFILE_TTL = int(os.getenv("COMPANY_PROFILE_TTL", str(24 * 3600)))
+
+
+def company_key(domain: Optional[str] = None, company: Optional[str] = None) -> Optional[str]:
+    """Normalize a domain (preferred) or company name into a store key"""
+    if domain:
+        key = domain.strip().lower()
+        for prefix in ("https://", "http://", "www."):
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+        key = key.split("/")[0]
+        if key:
+            return key
+    if company and company.strip():
+        return "company:" + " ".join(company.strip().lower().split())
+    return None
+
+
+class CompanyProfileStore:
+    """
+    Thread-safe in-memory store of company-level enrichment.
+    Each company is built once; concurrent leads at the same company wait for the first build.
+    """
+
+    def __init__(self, ttl: int = COMPANY_PROFILE_TTL):
+        self.ttl = ttl
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            profile = self._profiles.get(key)
+        if profile and time.time() - profile["built_at"] < self.ttl:
+            return profile
+        return None
+
+    def get_or_build(self, key: str, builder: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached profile for `key`, building it with `builder()` if missing or expired"""
+        profile = self.get(key)
+        if profile:
+            return profile
+
+        with self._key_lock(key):
+            # Another thread may have built it while we waited
+            profile = self.get(key)
+            if profile:
+                return profile
+            profile = builder()
+            profile["key"] = key
+            profile["built_at"] = time.time()
+            # Don't pin a failed provider call for the whole TTL - retry on the next lead
+            if not profile.get("errors"):
+                with self._lock:
+                    self._profiles[key] = profile
+            return profile
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._profiles.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._profiles)
+
+
+# Process-wide store shared by every enrichment
+company_profile_store = CompanyProfileStore()
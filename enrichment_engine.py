@@ -1,8 +1,17 @@
 import requests
 import json
 import os
+import time
 import streamlit as st
-from utils import ai_analyze_and_structure_lead_data
+from utils import ai_analyze_and_structure_lead_data, ai_summarize_company, extract_key_data_from_apis
+from company_profiles import company_key, company_profile_store
+from metering import metering_context, record_usage
+from circuit_breaker import get_breaker, CircuitOpenError, QUOTA_STATUS_CODES
+from hedging import hedged_call, mark_sent
+from payload_projection import project_response
+from enrichment_index import find_recent, save_enrichment
+from profiling import profiled
+from scheduler import scheduled, schedule_context, schedule_class_for, defer_rate_limit, SCHEDULER_RATE_LIMIT_RETRIES
 from typing import Dict, Any, Optional
 
 # Load API keys from environment variables or Streamlit secrets
@@ -24,6 +33,79 @@ print("DEBUG: APOLLO_API_KEY loaded:", "YES" if APOLLO_KEY else "NO")
 print("DEBUG: HUNTER_API_KEY loaded:", "YES" if HUNTER_KEY else "NO")
 print("DEBUG: SERP_API_KEY loaded:", "YES" if SERP_API_KEY else "NO")
 
+# Seconds before a provider request is abandoned
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "20"))
+
+# One keep-alive connection pool shared by every enrichment in the process
+_http = requests.Session()
+_http.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=int(os.getenv("HTTP_POOL_SIZE", "32"))))
+
+def _provider_get(provider: str, url: str, **kwargs) -> Any:
+    """
+    GET a provider endpoint through its circuit breaker and return its projected JSON body
+    (see payload_projection). The call is metered with its full latency including the body download
+    (providers only bill successful lookups). Raises CircuitOpenError while the provider is down.
+    Holds one of the provider's scheduler slots, queued by the caller's schedule class, until the body
+    is downloaded and parsed. Batch calls answered 429 are re-queued behind the scheduler's backoff.
+    """
+    breaker = get_breaker(provider)
+    try:
+        trial = breaker.before_call()
+    except CircuitOpenError:
+        record_usage(provider, units=0, status="short_circuited")
+        raise
+
+    kwargs.setdefault("timeout", PROVIDER_TIMEOUT)
+    kwargs.setdefault("stream", True)  # project_response decides how the body is read and parsed
+    try:
+        for _ in range(SCHEDULER_RATE_LIMIT_RETRIES + 1):
+            with scheduled(provider):
+                result = _send(provider, breaker, url, **kwargs)
+            if result is not _RATE_LIMITED:
+                return result
+        raise requests.HTTPError(f"{provider} still rate limited (HTTP 429) after {SCHEDULER_RATE_LIMIT_RETRIES} retries")
+    finally:
+        # A trial that raised something unexpected must not hold the half-open slot forever
+        breaker.end_trial(trial)
+
+_RATE_LIMITED = object()
+
+def _send(provider: str, breaker, url: str, **kwargs) -> Any:
+    """
+    The network part of _provider_get: request, breaker outcome, streamed body and metering.
+    Returns _RATE_LIMITED for a 429 the scheduler is backing off.
+    """
+    mark_sent()
+    started = time.time()
+    try:
+        response = _http.get(url, **kwargs)
+    except requests.RequestException as e:
+        breaker.record_failure(f"{type(e).__name__}: {e}")
+        record_usage(provider, units=0, status="error", latency_ms=(time.time() - started) * 1000)
+        raise
+
+    if response.status_code == 429 and defer_rate_limit(provider, response.headers):
+        # Batch traffic backs off in the scheduler and retries; interactive lookups keep the circuit closed
+        response.close()
+        record_usage(provider, units=0, status=429, latency_ms=(time.time() - started) * 1000)
+        return _RATE_LIMITED
+    elif response.status_code in QUOTA_STATUS_CODES:
+        breaker.record_failure(f"HTTP {response.status_code}", quota=True)
+    elif response.status_code >= 500:
+        breaker.record_failure(f"HTTP {response.status_code}")
+    else:
+        breaker.record_success()
+
+    try:
+        return project_response(provider, response)
+    finally:
+        record_usage(
+            provider,
+            units=1 if response.status_code == 200 else 0,
+            status=response.status_code,
+            latency_ms=(time.time() - started) * 1000,
+        )
+
 def enrich_with_ppld(email=None, name=None, company=None):
     url = "https://api.peopledatalabs.com/v5/person/enrich"
     params = {
@@ -32,8 +114,10 @@ def enrich_with_ppld(email=None, name=None, company=None):
         "name": name,
         "company": company,
     }
-    response = requests.get(url, params=params)
-    return response.json()
+    return hedged_call(
+        "peopledatalabs",
+        lambda: _provider_get("peopledatalabs", url, params=params)
+    )
 
 def enrich_with_apollo(email):
     url = f"https://api.apollo.io/v1/people/match"
@@ -46,13 +130,11 @@ def enrich_with_apollo(email):
     params = {
         'email': email
     }
-    response = requests.get(url, headers=headers, params=params)
-    return response.json()
+    return _provider_get("apollo", url, headers=headers, params=params)
 
 def enrich_with_hunter(domain):
     url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={HUNTER_KEY}"
-    response = requests.get(url)
-    return response.json()
+    return _provider_get("hunter", url)
 
 def google_search(query):
     url = "https://serpapi.com/search"
@@ -61,33 +143,143 @@ def google_search(query):
         "api_key": SERP_API_KEY,
         "engine": "google",
     }
-    res = requests.get(url, params=params)
-    return res.json()
+    return hedged_call(
+        "serpapi",
+        lambda: _provider_get("serpapi", url, params=params)
+    )
+
+def _response_error(data: Any) -> Optional[str]:
+    """Error carried in a provider's JSON body - quota, auth, rate-limit and server errors aren't raised"""
+    if not isinstance(data, dict):
+        return "unexpected response"
+    error = data.get("error") or data.get("errors")
+    if isinstance(error, dict) and error.get("type") == "not_found":
+        return None  # PeopleDataLabs: no matching person is a valid answer
+    return str(error) if error else None
+
+def build_company_profile(company: Optional[str] = None, domain: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the company-scoped lookups (Hunter.io domain search + recent news search)
+    and summarize them with ChatGPT. The result is shared by every lead at the company.
+    """
+    print(f"🏢 Building company profile for: {domain or company}")
+    company_api_data = {}
+    errors = []
+
+    if domain:
+        try:
+            hunter_data = enrich_with_hunter(domain)
+            company_api_data["hunter"] = hunter_data
+            if hunter_data.get("errors") or not isinstance(hunter_data.get("data"), dict):
+                # Quota/auth/server errors come back as a JSON body rather than an exception
+                print(f"❌ Hunter.io error response: {hunter_data.get('errors')}")
+                errors.append(f"hunter: {hunter_data.get('errors') or 'no data in response'}")
+            else:
+                print(f"✅ Hunter.io: {len(hunter_data['data'].get('emails') or [])} emails found")
+        except Exception as e:
+            print(f"❌ Hunter.io error: {e}")
+            company_api_data["hunter"] = {"error": str(e)}
+            errors.append(f"hunter: {e}")
+
+    news_query = f'{company or domain} news recent'
+    try:
+        search_results = google_search(news_query)
+        news = {"query": news_query, "scope": "company", "results": search_results}
+        if search_results.get("error"):
+            print(f"❌ Company news search error response: {search_results['error']}")
+            errors.append(f"news: {search_results['error']}")
+        else:
+            print(f"✅ Company news: {len(search_results.get('organic_results', []))} results")
+    except Exception as e:
+        print(f"❌ Company news search error: {e}")
+        news = {"query": news_query, "scope": "company", "error": str(e)}
+        errors.append(f"news: {e}")
+    company_api_data["google_searches"] = {"company_news": news}
+
+    summary = ai_summarize_company(company or "", domain or "", company_api_data)
+    if summary is None:
+        # Fall back to the raw extract for this lead, but don't cache it as the company's summary
+        summary = extract_key_data_from_apis(company_api_data)
+        errors.append("summary: ChatGPT company summary failed")
+
+    return {
+        "company": company,
+        "domain": domain,
+        "api_data": company_api_data,
+        "summary": summary,
+        "errors": errors,
+    }
 
+@profiled("lead")
 def comprehensive_lead_enrichment(
     name: str, 
     email: Optional[str] = None, 
     company: Optional[str] = None,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    priority: str = "normal",
+    user: Optional[str] = None,
+    reuse_recent: bool = True,
+    schedule_class: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Comprehensive lead enrichment that collects data from all APIs 
-    and passes it through ChatGPT for intelligent analysis and structuring
+    and passes it through ChatGPT for intelligent analysis and structuring.
+    `priority` ("low", "normal" or "high") feeds the model router;
+    provider credits and tokens are metered against `user`.
+    With `reuse_recent`, a recent stored enrichment of the same lead is returned instead
+    (marked with `from_index`); enrichments without provider errors are stored in the local index.
+    Profiled when ENABLE_PROFILING is set.
+    Provider/LLM calls are scheduled as `schedule_class` ("interactive", "high_value" or "bulk");
+    by default high-priority leads are high-value and the rest bulk.
     """
+    with metering_context(user=user, lead=email or name), \
+            schedule_context(schedule_class or schedule_class_for(priority)):
+        started = time.time()
+        if reuse_recent:
+            stored = find_recent(name, email, company, domain, priority=priority)
+            if stored:
+                print(f"📚 Reusing stored enrichment #{stored['from_index']['id']} for: {name}")
+                record_usage("enrichment", status="index_hit", latency_ms=(time.time() - started) * 1000)
+                return stored
+        
+        result = _run_lead_enrichment(name, email, company, domain, priority)
+        record_usage(
+            "enrichment",
+            status="error" if "error" in result else "ok",
+            latency_ms=(time.time() - started) * 1000,
+        )
+        if result.get("provider_errors"):
+            # A partial profile (outage, rate limit) would otherwise be reused for ENRICHMENT_MAX_AGE_DAYS
+            print(f"⚠️ Not storing enrichment for {name}: {len(result['provider_errors'])} provider error(s)")
+        elif "error" not in result:
+            save_enrichment(result, name, email, company, domain)
+        return result
+
+def _run_lead_enrichment(
+    name: str,
+    email: Optional[str],
+    company: Optional[str],
+    domain: Optional[str],
+    priority: str
+) -> Dict[str, Any]:
     print(f"🔍 Starting comprehensive enrichment for: {name}")
     
     # Collect all API data
     all_api_data = {}
+    errors = []
     
     # 1. PeopleDataLabs enrichment
     print("📊 Fetching PeopleDataLabs data...")
     try:
         ppld_data = enrich_with_ppld(email=email, name=name, company=company)
         all_api_data["peopledatalabs"] = ppld_data
+        if _response_error(ppld_data):
+            errors.append(f"peopledatalabs: {_response_error(ppld_data)}")
         print(f"✅ PeopleDataLabs: {'Success' if ppld_data.get('status') == 200 else 'Limited data'}")
     except Exception as e:
         print(f"❌ PeopleDataLabs error: {e}")
         all_api_data["peopledatalabs"] = {"error": str(e)}
+        errors.append(f"peopledatalabs: {e}")
     
     # 2. Apollo enrichment (if email provided)
     if email:
@@ -95,28 +287,33 @@ def comprehensive_lead_enrichment(
         try:
             apollo_data = enrich_with_apollo(email)
             all_api_data["apollo"] = apollo_data
+            if _response_error(apollo_data):
+                errors.append(f"apollo: {_response_error(apollo_data)}")
             print(f"✅ Apollo: {'Success' if apollo_data.get('person') else 'No match found'}")
         except Exception as e:
             print(f"❌ Apollo error: {e}")
             all_api_data["apollo"] = {"error": str(e)}
+            errors.append(f"apollo: {e}")
     
-    # 3. Hunter.io domain search (if domain provided)
-    if domain:
-        print("🎯 Fetching Hunter.io data...")
-        try:
-            hunter_data = enrich_with_hunter(domain)
-            all_api_data["hunter"] = hunter_data
-            print(f"✅ Hunter.io: {hunter_data.get('data', {}).get('emails', 0)} emails found")
-        except Exception as e:
-            print(f"❌ Hunter.io error: {e}")
-            all_api_data["hunter"] = {"error": str(e)}
+    # 3. Company-level enrichment (Hunter.io + news), computed once per company and shared
+    company_profile = None
+    profile_key = company_key(domain, company)
+    if profile_key:
+        company_profile = company_profile_store.get_or_build(
+            profile_key, lambda: build_company_profile(company=company, domain=domain)
+        )
+        print(f"🏢 Company profile: {profile_key}")
+        errors.extend(f"company profile: {error}" for error in company_profile["errors"])
+        if "hunter" in company_profile["api_data"]:
+            all_api_data["hunter"] = company_profile["api_data"]["hunter"]
     
-    # 4. Google Search for additional context
+    # 4. Google Search for additional person-level context
     search_queries = [
         f'"{name}" {company if company else ""} LinkedIn',
         f'"{name}" {company if company else ""} CEO founder',
-        f'{company if company else name} news recent'
     ]
+    if not company_profile:
+        search_queries.append(f'{name} news recent')
     
     print("🔍 Performing Google searches...")
     all_api_data["google_searches"] = {}
@@ -128,13 +325,18 @@ def comprehensive_lead_enrichment(
                 "query": query,
                 "results": search_results
             }
+            if _response_error(search_results):
+                errors.append(f"search {i+1}: {_response_error(search_results)}")
             print(f"✅ Search {i+1}: {len(search_results.get('organic_results', []))} results")
         except Exception as e:
             print(f"❌ Search {i+1} error: {e}")
+            errors.append(f"search {i+1}: {e}")
             all_api_data["google_searches"][f"query_{i+1}"] = {
                 "query": query,
                 "error": str(e)
             }
+    if company_profile:
+        all_api_data["google_searches"].update(company_profile["api_data"]["google_searches"])
     
     # 5. Pass all data through ChatGPT for intelligent analysis
     print("🤖 Analyzing data with ChatGPT...")
@@ -142,12 +344,22 @@ def comprehensive_lead_enrichment(
         structured_lead_profile = ai_analyze_and_structure_lead_data(
             all_api_data=all_api_data,
             lead_name=name,
-            company_name=company or ""
+            company_name=company or "",
+            priority=priority,
+            company_profile=company_profile
         )
         print("✅ ChatGPT analysis completed successfully!")
         
+        if company_profile:
+            structured_lead_profile["company_profile"] = {
+                "key": company_profile["key"],
+                "summary": company_profile["summary"],
+                "built_at": company_profile["built_at"],
+            }
+        
         # Add the raw API data for reference
         structured_lead_profile["raw_api_data"] = all_api_data
+        structured_lead_profile["provider_errors"] = errors
         
         return structured_lead_profile
         
@@ -156,6 +368,7 @@ def comprehensive_lead_enrichment(
         return {
             "error": f"ChatGPT analysis failed: {str(e)}",
             "raw_api_data": all_api_data,
+            "provider_errors": errors,
             "lead_summary": {
                 "full_name": name,
                 "company": company or "Unknown",
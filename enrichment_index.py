@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+from company_profiles import company_key
+from model_router import satisfies_priority
+
+# Persistent store + full-text index of past enrichments
+ENRICHMENT_INDEX_DB = os.getenv("ENRICHMENT_INDEX_DB", os.path.join("data", "enrichments.db"))
+# Stored enrichments younger than this are reused instead of calling the APIs again
+ENRICHMENT_MAX_AGE_DAYS = float(os.getenv("ENRICHMENT_MAX_AGE_DAYS", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enrichments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    lookup_key TEXT NOT NULL,
+    lead_name TEXT,
+    company_name TEXT,
+    title TEXT,
+    email TEXT,
+    domain TEXT,
+    result BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_enrichments_lookup ON enrichments (lookup_key, created_at);
+"""
+
+# Searchable columns, in snippet order
+_FTS_COLUMNS = ("lead_name", "company_name", "title", "emails", "ai_analysis")
+_FTS_SCHEMA = f"CREATE VIRTUAL TABLE IF NOT EXISTS enrichments_fts USING fts5({', '.join(_FTS_COLUMNS)}, tokenize='unicode61')"
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_fts_available: Dict[str, bool] = {}
+
+
+def _connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    db_path = db_path or ENRICHMENT_INDEX_DB
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        with _schema_lock:
+            if db_path not in _fts_available:
+                conn.executescript(_SCHEMA)
+                try:
+                    conn.execute(_FTS_SCHEMA)
+                    _fts_available[db_path] = True
+                except sqlite3.OperationalError:
+                    print("⚠️ SQLite FTS5 not available - falling back to LIKE search")
+                    _fts_available[db_path] = False
+                conn.commit()
+        connections[db_path] = conn
+    return conn
+
+
+def lookup_key(name: str, email: Optional[str] = None, company: Optional[str] = None, domain: Optional[str] = None) -> str:
+    """Identity of a lead for reuse: the email when known, else name + normalized domain/company"""
+    if email and email.strip():
+        return "email:" + email.strip().lower()
+    return "name:" + " ".join((name or "").lower().split()) + "|" + (company_key(domain, company) or "")
+
+
+def _searchable_fields(result: Dict[str, Any]) -> Dict[str, str]:
+    raw = result.get("raw_api_data") or {}
+    person = (raw.get("peopledatalabs") or {}).get("data") or {}
+    apollo_person = (raw.get("apollo") or {}).get("person") or {}
+    emails = [email_data.get("value") for email_data in result.get("hunter_emails") or [] if isinstance(email_data, dict)]
+    emails.append(apollo_person.get("email") if isinstance(apollo_person, dict) else None)
+    return {
+        "lead_name": result.get("lead_name") or "",
+        "company_name": result.get("company_name") or "",
+        "title": (person.get("job_title") if isinstance(person, dict) else None)
+                 or (apollo_person.get("title") if isinstance(apollo_person, dict) else None) or "",
+        "emails": " ".join(email for email in emails if email),
+        "ai_analysis": result.get("ai_analysis") or "",
+    }
+
+
+def save_enrichment(
+    result: Dict[str, Any],
+    name: str,
+    email: Optional[str] = None,
+    company: Optional[str] = None,
+    domain: Optional[str] = None,
+    db_path: Optional[str] = None
+) -> Optional[int]:
+    """Store an enrichment and index it for search; returns its id"""
+    fields = _searchable_fields(result)
+    blob = zlib.compress(json.dumps(result, default=str).encode("utf-8"))
+    try:
+        conn = _connection(db_path)
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO enrichments (created_at, lookup_key, lead_name, company_name, title, email, domain, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), lookup_key(name, email, company, domain), fields["lead_name"] or name,
+                 fields["company_name"] or company, fields["title"], email, domain, blob),
+            )
+            if _fts_available[db_path or ENRICHMENT_INDEX_DB]:
+                conn.execute(
+                    f"INSERT INTO enrichments_fts (rowid, {', '.join(_FTS_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, *(fields[column] for column in _FTS_COLUMNS)),
+                )
+        return cursor.lastrowid
+    except sqlite3.Error as e:
+        print(f"⚠️ Enrichment index error: {e}")
+        return None
+
+
+def _load(row) -> Dict[str, Any]:
+    enrichment_id, created_at, blob = row
+    result = json.loads(zlib.decompress(blob))
+    result["from_index"] = {"id": enrichment_id, "enriched_at": created_at}
+    return result
+
+
+def get_enrichment(enrichment_id: int, db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    row = _connection(db_path).execute(
+        "SELECT id, created_at, result FROM enrichments WHERE id = ?", (enrichment_id,)
+    ).fetchone()
+    return _load(row) if row else None
+
+
+def find_recent(
+    name: str,
+    email: Optional[str] = None,
+    company: Optional[str] = None,
+    domain: Optional[str] = None,
+    max_age_days: float = ENRICHMENT_MAX_AGE_DAYS,
+    db_path: Optional[str] = None,
+    priority: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Most recent stored enrichment of this lead younger than `max_age_days`, if any.
+    Enrichments with provider errors, and with `priority` those analyzed by a smaller model than that
+    priority requires, are skipped.
+    """
+    try:
+        rows = _connection(db_path).execute(
+            "SELECT id, created_at, result FROM enrichments WHERE lookup_key = ? AND created_at >= ? "
+            "ORDER BY created_at DESC LIMIT 10",
+            (lookup_key(name, email, company, domain), time.time() - max_age_days * 86400),
+        )
+        for row in rows:
+            stored = _load(row)
+            if not stored.get("provider_errors") and satisfies_priority(stored.get("model_routing"), priority):
+                return stored
+    except sqlite3.Error as e:
+        print(f"⚠️ Enrichment index error: {e}")
+    return None
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 prefix query (every word must match)"""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_enrichments(text: str, limit: int = 20, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Full-text search over names, companies, titles, discovered emails and AI analysis"""
+    query = _fts_query(text)
+    if not query:
+        return []
+    conn = _connection(db_path)
+    if _fts_available[db_path or ENRICHMENT_INDEX_DB]:
+        rows = conn.execute(
+            "SELECT e.id, e.created_at, e.lead_name, e.company_name, e.title, "
+            "snippet(enrichments_fts, -1, '**', '**', '…', 16) "
+            "FROM enrichments_fts JOIN enrichments e ON e.id = enrichments_fts.rowid "
+            "WHERE enrichments_fts MATCH ? ORDER BY bm25(enrichments_fts) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+    else:
+        pattern = f"%{text.strip().lower()}%"
+        rows = conn.execute(
+            "SELECT id, created_at, lead_name, company_name, title, '' FROM enrichments "
+            "WHERE lower(lead_name) LIKE ? OR lower(company_name) LIKE ? OR lower(title) LIKE ? OR lower(email) LIKE ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (pattern, pattern, pattern, pattern, limit),
+        ).fetchall()
+    return [
+        {"id": row[0], "enriched_at": row[1], "lead_name": row[2], "company_name": row[3], "title": row[4], "snippet": row[5]}
+        for row in rows
+    ]
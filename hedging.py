@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Optional, TypeVar
+from scheduler import SCHEDULER_ENABLED, get_scheduler
+
+T = TypeVar("T")
+
+# Hedging is opt-in: a hedge is a second paid request
+HEDGING_ENABLED = os.getenv("ENABLE_REQUEST_HEDGING", "false").lower() in ("1", "true", "yes")
+# Providers whose slow responses are worth racing
+HEDGED_PROVIDERS = frozenset(
+    provider.strip() for provider in os.getenv("HEDGED_PROVIDERS", "serpapi,peopledatalabs").split(",") if provider.strip()
+)
+# Latency percentile after which the duplicate request is sent
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+# Max fraction of a provider's calls that may be hedged (caps extra spend)
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+# Observations needed before the percentile is trusted
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW = 500
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("HEDGE_POOL_SIZE", "32")), thread_name_prefix="hedge")
+
+
+class HedgeStats:
+    """Rolling latency window and hedge counters for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.latencies = deque(maxlen=HEDGE_WINDOW)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when there isn't enough history"""
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * HEDGE_PERCENTILE), len(ordered) - 1)]
+
+    def record_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def try_reserve_hedge(self) -> bool:
+        """Reserve a hedge if it keeps the provider within its hedge budget"""
+        with self._lock:
+            if self.hedges + 1 > self.calls * HEDGE_MAX_RATIO:
+                return False
+            self.hedges += 1
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": round(self.hedges / self.calls, 3) if self.calls else 0,
+                "win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else 0,
+                "hedge_after_ms": round(delay * 1000) if delay is not None else None,
+            }
+
+
+_stats: Dict[str, HedgeStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _provider_stats(provider: str) -> HedgeStats:
+    with _stats_lock:
+        if provider not in _stats:
+            _stats[provider] = HedgeStats(provider)
+        return _stats[provider]
+
+
+class _Attempt:
+    """Timing of one attempt: latency runs from when the request was sent, not from local slot queueing"""
+    __slots__ = ("sent", "sent_at", "finished_at")
+
+    def __init__(self):
+        self.sent = threading.Event()  # Also set when the attempt ends without sending
+        self.sent_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def latency_from(self, sent_at: Optional[float]) -> Optional[float]:
+        return self.finished_at - sent_at if sent_at is not None and self.finished_at is not None else None
+
+
+_current_attempt = contextvars.ContextVar("hedge_attempt", default=None)
+
+
+def mark_sent() -> None:
+    """
+    Called by a hedged call each time its request goes out (after waiting for a scheduler slot);
+    a call re-sent after a rate-limit backoff is timed from its last send.
+    """
+    attempt = _current_attempt.get()
+    if attempt is not None:
+        attempt.sent_at = time.time()
+        attempt.sent.set()
+
+
+def _attempt(call: Callable[[], T], attempt: _Attempt) -> Callable[[], T]:
+    def run():
+        _current_attempt.set(attempt)
+        try:
+            return call()
+        finally:
+            attempt.finished_at = time.time()
+            attempt.sent.set()
+    return run
+
+
+def _locally_queued(provider: str) -> bool:
+    """A slow call that is still waiting behind our own traffic won't be sped up by a duplicate"""
+    return SCHEDULER_ENABLED and get_scheduler(provider).queued() > 0
+
+
+def hedged_call(provider: str, call: Callable[[], T]) -> T:
+    """
+    Run `call()`; if it hasn't answered within the provider's observed p90 of the time since it
+    called mark_sent(), issue one duplicate and return whichever finishes first.
+    No hedge is sent while the provider's scheduler has calls queued.
+    Without hedging enabled for the provider this is just `call()`.
+    """
+    if not HEDGING_ENABLED or provider not in HEDGED_PROVIDERS:
+        return call()
+
+    stats = _provider_stats(provider)
+    stats.record_call()
+
+    # Attempts run in pool threads; carry over the caller's context (metering user/lead)
+    primary_attempt = _Attempt()
+    primary = _executor.submit(contextvars.copy_context().run, _attempt(call, primary_attempt))
+    delay = stats.hedge_delay()
+    if delay is not None:
+        primary_attempt.sent.wait()
+        if primary_attempt.sent_at is not None:
+            wait([primary], timeout=max(primary_attempt.sent_at + delay - time.time(), 0))
+    if delay is None or primary.done() or _locally_queued(provider) or not stats.try_reserve_hedge():
+        result = primary.result()
+        latency = primary_attempt.latency_from(primary_attempt.sent_at)
+        if latency is not None:
+            stats.observe(latency)
+        return result
+
+    print(f"⏱️ {provider} slower than p{int(HEDGE_PERCENTILE * 100)} ({delay:.1f}s) - sending hedge request")
+    hedge_attempt = _Attempt()
+    hedge = _executor.submit(contextvars.copy_context().run, _attempt(call, hedge_attempt))
+    pending = {primary, hedge}
+    while True:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        succeeded = [future for future in done if future.exception() is None]
+        if succeeded:
+            winner = primary if primary in succeeded else hedge
+            if winner is hedge:
+                stats.record_hedge_win()
+            # Measured from the primary's send, i.e. the latency the caller saw from the provider side
+            stats.observe((hedge_attempt if winner is hedge else primary_attempt).latency_from(primary_attempt.sent_at))
+            return winner.result()
+        if not pending:
+            # Both attempts failed - surface the primary's error
+            return primary.result()
+
+
+def hedge_stats() -> Dict[str, Dict[str, Any]]:
+    with _stats_lock:
+        stats = list(_stats.values())
+    return {provider_stats.provider: provider_stats.snapshot() for provider_stats in stats}
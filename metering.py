@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import time
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Sequence
+
+# Local usage store (SQLite is safe to share between threads and processes)
+USAGE_DB_PATH = os.getenv("USAGE_DB_PATH", os.path.join("data", "usage.db"))
+
+# Billing unit per provider
+PROVIDER_UNITS = {
+    "peopledatalabs": "credit",
+    "apollo": "credit",
+    "hunter": "credit",
+    "serpapi": "search",
+    "openai": "token",
+    "enrichment": "lead",
+}
+
+# USD per provider credit/search, configured per plan (OpenAI cost comes from the model router)
+CREDIT_COST_USD = {
+    "peopledatalabs": float(os.getenv("PEOPLEDATALABS_CREDIT_COST_USD", "0")),
+    "apollo": float(os.getenv("APOLLO_CREDIT_COST_USD", "0")),
+    "hunter": float(os.getenv("HUNTER_CREDIT_COST_USD", "0")),
+    "serpapi": float(os.getenv("SERP_API_SEARCH_COST_USD", "0")),
+}
+
+# Monthly quota per provider in its billing unit (0 = unknown)
+MONTHLY_QUOTA = {
+    "peopledatalabs": int(os.getenv("PEOPLEDATALABS_MONTHLY_QUOTA", "0")),
+    "apollo": int(os.getenv("APOLLO_MONTHLY_QUOTA", "0")),
+    "hunter": int(os.getenv("HUNTER_MONTHLY_QUOTA", "0")),
+    "serpapi": int(os.getenv("SERP_API_MONTHLY_QUOTA", "0")),
+    "openai": int(os.getenv("OPENAI_MONTHLY_TOKEN_QUOTA", "0")),
+}
+
+GROUP_COLUMNS = ("day", "month", "provider", "user", "lead", "model", "unit", "status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    month TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    units REAL NOT NULL DEFAULT 0,
+    unit TEXT NOT NULL,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    user TEXT,
+    lead TEXT,
+    model TEXT,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    status TEXT,
+    latency_ms REAL,
+    pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_usage_day_provider ON usage (day, provider);
+CREATE INDEX IF NOT EXISTS idx_usage_month_provider ON usage (month, provider);
+"""
+
+_current_user = contextvars.ContextVar("metering_user", default=None)
+_current_lead = contextvars.ContextVar("metering_lead", default=None)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def _connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """One connection per thread and database; WAL lets concurrent processes write safely"""
+    db_path = db_path or USAGE_DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        with _schema_lock:
+            if db_path not in _schema_ready:
+                conn.executescript(_SCHEMA)
+                _schema_ready.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+@contextmanager
+def metering_context(user: Optional[str] = None, lead: Optional[str] = None):
+    """Attribute every usage record inside the block to `user` and `lead`"""
+    user_token = _current_user.set(user or _current_user.get())
+    lead_token = _current_lead.set(lead or _current_lead.get())
+    try:
+        yield
+    finally:
+        _current_user.reset(user_token)
+        _current_lead.reset(lead_token)
+
+
+def record_usage(
+    provider: str,
+    units: float = 1,
+    unit: Optional[str] = None,
+    cost_usd: Optional[float] = None,
+    model: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    status: Optional[str] = None,
+    latency_ms: Optional[float] = None,
+    db_path: Optional[str] = None,
+) -> None:
+    """Record one metered call. Never raises - metering must not break an enrichment."""
+    now = time.time()
+    stamp = datetime.fromtimestamp(now, tz=timezone.utc)
+    if cost_usd is None:
+        cost_usd = units * CREDIT_COST_USD.get(provider, 0.0)
+    try:
+        _connection(db_path).execute(
+            "INSERT INTO usage (ts, day, month, provider, units, unit, cost_usd, user, lead, model, "
+            "prompt_tokens, completion_tokens, status, latency_ms, pid) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                now, stamp.strftime("%Y-%m-%d"), stamp.strftime("%Y-%m"), provider, units,
+                unit or PROVIDER_UNITS.get(provider, "call"), cost_usd,
+                _current_user.get() or "anonymous", _current_lead.get(), model,
+                prompt_tokens, completion_tokens, None if status is None else str(status),
+                latency_ms, os.getpid(),
+            ),
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️ Metering error: {e}")
+
+
+def record_openai_usage(usage_info: Dict[str, Any], latency_ms: Optional[float] = None) -> None:
+    """Record a completion from a model router `usage_summary` dict"""
+    record_usage(
+        "openai",
+        units=usage_info["total_tokens"],
+        cost_usd=usage_info["estimated_cost_usd"],
+        model=usage_info["model"],
+        prompt_tokens=usage_info["prompt_tokens"],
+        completion_tokens=usage_info["completion_tokens"],
+        latency_ms=latency_ms,
+    )
+
+
+def aggregate_usage(
+    group_by: Sequence[str] = ("day", "provider", "user"),
+    since_days: Optional[int] = None,
+    db_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Sum calls, units and cost grouped by any of GROUP_COLUMNS"""
+    columns = [column for column in group_by if column in GROUP_COLUMNS]
+    if not columns:
+        raise ValueError(f"group_by must use columns from {GROUP_COLUMNS}")
+    select = ", ".join(columns)
+    where, params = "", []
+    if since_days is not None:
+        where = "WHERE ts >= ?"
+        params.append(time.time() - since_days * 86400)
+    rows = _connection(db_path).execute(
+        f"SELECT {select}, COUNT(*), SUM(units), SUM(cost_usd), AVG(latency_ms) FROM usage "
+        f"{where} GROUP BY {select} ORDER BY {select}",
+        params,
+    ).fetchall()
+    results = []
+    for row in rows:
+        entry = dict(zip(columns, row[:len(columns)]))
+        calls, units, cost, latency = row[len(columns):]
+        entry.update({
+            "calls": calls,
+            "units": units or 0,
+            "cost_usd": round(cost or 0, 6),
+            "avg_latency_ms": round(latency, 1) if latency is not None else None,
+        })
+        results.append(entry)
+    return results
+
+
+def remaining_quota(db_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Units used this month versus the configured monthly quota per provider"""
+    month = datetime.now(timezone.utc).strftime("%Y-%m")
+    used = dict(_connection(db_path).execute(
+        "SELECT provider, SUM(units) FROM usage WHERE month = ? GROUP BY provider", (month,)
+    ).fetchall())
+    quotas = {}
+    for provider, quota in MONTHLY_QUOTA.items():
+        provider_used = used.get(provider) or 0
+        quotas[provider] = {
+            "unit": PROVIDER_UNITS[provider],
+            "used": provider_used,
+            "quota": quota or None,
+            "remaining": max(quota - provider_used, 0) if quota else None,
+        }
+    return quotas
+
+
+def throughput(window_seconds: int = 3600, db_path: Optional[str] = None) -> Dict[str, Any]:
+    """Completed enrichments in the trailing window and the implied leads/hour rate"""
+    row = _connection(db_path).execute(
+        "SELECT COUNT(*), AVG(latency_ms) FROM usage WHERE provider = 'enrichment' AND ts >= ?",
+        (time.time() - window_seconds,),
+    ).fetchone()
+    leads, latency = row
+    return {
+        "leads": leads,
+        "leads_per_hour": round(leads * 3600 / window_seconds, 1),
+        "avg_lead_latency_ms": round(latency, 1) if latency is not None else None,
+    }
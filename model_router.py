@@ -0,0 +1,127 @@
+import os
+from typing import Dict, Any, Optional
+
+# Model tiers (override via environment variables)
+SMALL_MODEL = os.getenv("OPENAI_SMALL_MODEL", "gpt-4o-mini")
+LARGE_MODEL = os.getenv("OPENAI_LARGE_MODEL", "gpt-4")
+
+# Leads scoring at or above this richness are considered routine enough for the small model
+RICHNESS_THRESHOLD = int(os.getenv("MODEL_ROUTER_RICHNESS_THRESHOLD", "4"))
+# Opt-in: also send data-poor normal-priority leads to the large model (costly in bulk runs)
+ESCALATE_SPARSE_LEADS = os.getenv("MODEL_ROUTER_ESCALATE_SPARSE", "false").lower() in ("1", "true", "yes")
+
+# USD per 1K tokens as (prompt, completion); unknown models are priced at 0
+MODEL_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+PRIORITIES = ("low", "normal", "high")
+
+
+def score_input_richness(all_api_data: Dict[str, Any]) -> int:
+    """Score how much usable data the providers returned (0 = nothing, higher = richer)"""
+    score = 0
+
+    ppld = all_api_data.get("peopledatalabs") or {}
+    person = ppld.get("data") if isinstance(ppld, dict) else None
+    if isinstance(person, dict):
+        score += 2
+        if person.get("job_title") and person.get("job_company_name"):
+            score += 1
+
+    apollo = all_api_data.get("apollo") or {}
+    if isinstance(apollo, dict) and apollo.get("person"):
+        score += 2
+
+    hunter = all_api_data.get("hunter") or {}
+    hunter_data = hunter.get("data") if isinstance(hunter, dict) else None
+    if isinstance(hunter_data, dict) and hunter_data.get("emails"):
+        score += 1
+
+    searches = all_api_data.get("google_searches") or {}
+    for search_data in searches.values():
+        results = search_data.get("results") if isinstance(search_data, dict) else None
+        if isinstance(results, dict) and results.get("organic_results"):
+            score += 1
+
+    return score
+
+
+def is_ambiguous(all_api_data: Dict[str, Any]) -> bool:
+    """Detect conflicting identities between PeopleDataLabs and Apollo"""
+    ppld = all_api_data.get("peopledatalabs") or {}
+    apollo = all_api_data.get("apollo") or {}
+    person = ppld.get("data") if isinstance(ppld, dict) else None
+    apollo_person = apollo.get("person") if isinstance(apollo, dict) else None
+    if not isinstance(person, dict) or not isinstance(apollo_person, dict):
+        return False
+
+    ppld_company = (person.get("job_company_name") or "").strip().lower()
+    organization = apollo_person.get("organization") or {}
+    apollo_company = (organization.get("name") or "").strip().lower() if isinstance(organization, dict) else ""
+    if ppld_company and apollo_company and ppld_company not in apollo_company and apollo_company not in ppld_company:
+        return True
+
+    ppld_name = (person.get("full_name") or "").strip().lower()
+    apollo_name = (apollo_person.get("name") or "").strip().lower()
+    return bool(ppld_name and apollo_name and ppld_name != apollo_name)
+
+
+def choose_model(all_api_data: Dict[str, Any], priority: Optional[str] = "normal") -> Dict[str, Any]:
+    """
+    Pick the model for a lead analysis.
+    High-priority and ambiguous leads go to the large model; everything else to the small one.
+    Data-poor normal-priority leads are only escalated with MODEL_ROUTER_ESCALATE_SPARSE.
+    """
+    priority = priority if priority in PRIORITIES else "normal"
+    richness = score_input_richness(all_api_data)
+    ambiguous = is_ambiguous(all_api_data)
+
+    if priority == "high":
+        model, reason = LARGE_MODEL, "high-priority lead"
+    elif ambiguous:
+        model, reason = LARGE_MODEL, "conflicting provider data"
+    elif richness < RICHNESS_THRESHOLD and priority == "normal" and ESCALATE_SPARSE_LEADS:
+        model, reason = LARGE_MODEL, "sparse input data"
+    elif richness < RICHNESS_THRESHOLD:
+        model, reason = SMALL_MODEL, "sparse input data"
+    else:
+        model, reason = SMALL_MODEL, "routine lead"
+
+    return {
+        "model": model,
+        "reason": reason,
+        "priority": priority,
+        "richness_score": richness,
+        "ambiguous": ambiguous,
+    }
+
+
+def satisfies_priority(routing: Optional[Dict[str, Any]], priority: Optional[str]) -> bool:
+    """Whether an analysis routed as `routing` is good enough for a lead of `priority` (high needs the large model)"""
+    if priority != "high":
+        return True
+    return (routing or {}).get("model") == LARGE_MODEL
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a completion"""
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return round(prompt_tokens / 1000 * prompt_price + completion_tokens / 1000 * completion_price, 6)
+
+
+def usage_summary(model: str, usage: Any) -> Dict[str, Any]:
+    """Convert an OpenAI `response.usage` object into a plain dict with cost"""
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    return {
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "estimated_cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+    }
@@ -0,0 +1,124 @@
+import streamlit as st
+import pandas as pd
+from metering import aggregate_usage, remaining_quota, throughput
+from circuit_breaker import breaker_states
+from hedging import hedge_stats, HEDGING_ENABLED
+from scheduler import scheduler_states, SCHEDULER_ENABLED, SCHEDULE_CLASSES, INTERACTIVE
+
+st.set_page_config(
+    page_title="Usage & Quota Dashboard",
+    page_icon="📊",
+    layout="wide"
+)
+
+st.title("📊 Usage & Quota Dashboard")
+st.markdown("Provider credits, OpenAI tokens and spend recorded by every enrichment (all users and processes)")
+
+with st.sidebar:
+    st.header("⚙️ Filters")
+    since_days = st.slider("Days of history", min_value=1, max_value=90, value=7)
+    if st.button("🔄 Refresh", use_container_width=True):
+        st.rerun()
+
+# Throughput
+st.header("⚡ Throughput")
+hourly = throughput(window_seconds=3600)
+daily = throughput(window_seconds=86400)
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Leads (last hour)", hourly["leads"])
+with col2:
+    st.metric("Leads/hour (24h avg)", daily["leads_per_hour"])
+with col3:
+    latency = daily["avg_lead_latency_ms"]
+    st.metric("Avg. lead latency", f"{latency / 1000:.1f}s" if latency else "N/A")
+
+# Spend
+st.header("💲 Spend")
+by_day_provider = pd.DataFrame(aggregate_usage(group_by=("day", "provider"), since_days=since_days))
+if by_day_provider.empty:
+    st.info("No usage recorded yet - run an enrichment to start metering.")
+else:
+    billable = by_day_provider[by_day_provider["provider"] != "enrichment"]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total spend", f"${billable['cost_usd'].sum():.2f}")
+    with col2:
+        tokens = billable.loc[billable["provider"] == "openai", "units"].sum()
+        st.metric("OpenAI tokens", f"{int(tokens):,}")
+
+    spend_chart = billable.pivot_table(index="day", columns="provider", values="cost_usd", aggfunc="sum").fillna(0)
+    st.bar_chart(spend_chart)
+
+    st.subheader("By day and provider")
+    st.dataframe(billable, use_container_width=True, hide_index=True)
+
+    st.subheader("By user")
+    by_user = pd.DataFrame(aggregate_usage(group_by=("user", "provider"), since_days=since_days))
+    st.dataframe(by_user[by_user["provider"] != "enrichment"], use_container_width=True, hide_index=True)
+
+# Circuit breakers
+st.header("🔌 Provider Circuit Breakers")
+provider_states = breaker_states()
+if provider_states:
+    st.dataframe(pd.DataFrame(list(provider_states.values())), use_container_width=True, hide_index=True)
+else:
+    st.info("No provider has been called in this process yet.")
+by_status = pd.DataFrame(aggregate_usage(group_by=("provider", "status"), since_days=since_days))
+if not by_status.empty:
+    short_circuited = by_status[by_status["status"] == "short_circuited"]
+    if not short_circuited.empty:
+        st.write("Calls skipped by open circuits (all processes):")
+        st.dataframe(short_circuited[["provider", "calls"]], use_container_width=True, hide_index=True)
+
+# Request hedging
+st.header("⏱️ Request Hedging")
+if not HEDGING_ENABLED:
+    st.info("Hedging is off - set ENABLE_REQUEST_HEDGING=true to race slow SerpAPI/PeopleDataLabs calls.")
+elif hedge_stats():
+    st.dataframe(pd.DataFrame(list(hedge_stats().values())), use_container_width=True, hide_index=True)
+    st.caption("A hedge is a duplicate request sent once a call exceeds the provider's observed p90 latency.")
+else:
+    st.info("No hedged provider has been called in this process yet.")
+
+# Priority scheduling
+st.header("🚦 Call Scheduler")
+scheduler_rows = [
+    {
+        "resource": state["resource"],
+        "class": schedule_class,
+        "slots in use": f"{state['in_use']}/{state['slots']}",
+        "rate budget (/s)": state["rate_per_second"] or "-",
+        "backing off (s)": state["backoff_seconds"] if schedule_class != INTERACTIVE else 0,
+        "queued": state["queued"][schedule_class],
+        "granted": state["granted"][schedule_class],
+        "avg wait (ms)": state["avg_wait_ms"][schedule_class],
+        "max wait (ms)": state["max_wait_ms"][schedule_class],
+    }
+    for state in scheduler_states().values()
+    for schedule_class in SCHEDULE_CLASSES
+    if state["granted"][schedule_class] or state["queued"][schedule_class]
+]
+if not SCHEDULER_ENABLED:
+    st.info("The scheduler is off - set ENABLE_SCHEDULER=true to prioritize interactive lookups over batch work.")
+elif scheduler_rows:
+    st.dataframe(pd.DataFrame(scheduler_rows), use_container_width=True, hide_index=True)
+    st.caption("Slots and rate budgets are shared by weighted fair queuing: interactive lookups go ahead of "
+               "high-value leads, which go ahead of bulk batch leads. A 429 on batch work pauses batch calls "
+               "instead of opening the provider's circuit.")
+else:
+    st.info("No provider or OpenAI call has been scheduled in this process yet.")
+
+# Quota
+st.header("🎫 Remaining Quota (this month)")
+quota_rows = []
+for provider, quota in remaining_quota().items():
+    quota_rows.append({
+        "provider": provider,
+        "unit": quota["unit"],
+        "used": quota["used"],
+        "monthly quota": quota["quota"] if quota["quota"] else "not set",
+        "remaining": quota["remaining"] if quota["remaining"] is not None else "N/A",
+    })
+st.dataframe(pd.DataFrame(quota_rows), use_container_width=True, hide_index=True)
+st.caption("Set <PROVIDER>_MONTHLY_QUOTA and per-credit cost variables (see env_example.txt) to track budget.")
@@ -0,0 +1,205 @@
+import os
+import gzip
+import json
+import time
+import uuid
+from typing import Dict, Any, Union
+
+try:
+    import ijson  # Optional: incremental parsing without building the full payload
+except ImportError:
+    ijson = None
+
+PROJECTION_ENABLED = os.getenv("ENABLE_PAYLOAD_PROJECTION", "true").lower() in ("1", "true", "yes")
+# When set, every full provider body is archived here as gzip before projection
+RAW_PAYLOAD_DIR = os.getenv("RAW_PAYLOAD_DIR", "")
+# Bodies whose Content-Length is at least this many bytes are parsed incrementally with ijson.
+# ijson costs roughly twice the CPU of json.loads + project(), so it is only worth it when it
+# keeps a very large body from being held in memory. Smaller or unsized bodies use json.loads.
+STREAM_PARSE_MIN_BYTES = int(os.getenv("STREAM_PARSE_MIN_BYTES", str(4 * 1024 * 1024)))
+
+# Fields kept per provider. `True` keeps a whole subtree; a dict keeps only its keys.
+# A spec applied to a list applies to each element.
+Spec = Union[bool, Dict[str, Any]]
+
+PROVIDER_FIELDS: Dict[str, Spec] = {
+    "peopledatalabs": {
+        "status": True,
+        "error": True,
+        "likelihood": True,
+        "data": {
+            "full_name": True,
+            "job_title": True,
+            "job_company_name": True,
+            "location_names": True,
+            "linkedin_url": True,
+            "twitter_url": True,
+            "emails": {"address": True},
+            "education": {"school": {"name": True}},
+            "skills": True,
+            "industry": True,
+            "job_start_date": True,
+            "job_title_levels": True,
+        },
+    },
+    "apollo": {
+        "error": True,
+        "person": {
+            "name": True,
+            "title": True,
+            "linkedin_url": True,
+            "twitter_url": True,
+            "email": True,
+            "phone": True,
+            "city": True,
+            "organization": {"name": True},
+        },
+    },
+    "hunter": {
+        "errors": True,
+        "data": {
+            "domain": True,
+            "organization": True,
+            "pattern": True,
+            "webmail": True,
+            "accept_all": True,
+            "emails": {
+                "value": True,
+                "type": True,
+                "first_name": True,
+                "last_name": True,
+                "position": True,
+                "department": True,
+                "seniority": True,
+                "confidence": True,
+                "linkedin": True,
+                "verification": True,
+            },
+        },
+    },
+    "serpapi": {
+        "error": True,
+        "search_metadata": {"status": True},
+        "organic_results": {"position": True, "title": True, "snippet": True, "link": True, "date": True},
+    },
+}
+
+
+def project(value: Any, spec: Spec) -> Any:
+    """Keep only the fields declared in `spec` from an already-parsed value"""
+    if spec is True:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], sub_spec) for key, sub_spec in spec.items() if key in value}
+    return value
+
+
+def _stream_project(stream, spec: Spec) -> Any:
+    """
+    Parse JSON incrementally and build only the declared fields.
+    Undeclared subtrees (ads, knowledge graphs, email sources...) are skipped without being materialized.
+    """
+    root = None
+    stack = []  # frames of [container, spec, current_key, current_key_spec]
+    skip_depth = 0
+    skip_next = False
+
+    def attach(item):
+        nonlocal root
+        if not stack:
+            root = item
+        elif isinstance(stack[-1][0], list):
+            stack[-1][0].append(item)
+        else:
+            stack[-1][0][stack[-1][2]] = item
+
+    for event, value in ijson.basic_parse(stream, use_float=True):
+        if skip_depth:
+            if event in ("start_map", "start_array"):
+                skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                skip_depth -= 1
+            continue
+
+        if event == "map_key":
+            frame = stack[-1]
+            key_spec = True if frame[1] is True else frame[1].get(value)
+            if key_spec:
+                frame[2], frame[3] = value, key_spec
+            else:
+                skip_next = True
+            continue
+
+        if skip_next:
+            skip_next = False
+            if event in ("start_map", "start_array"):
+                skip_depth = 1
+            continue
+
+        if event in ("end_map", "end_array"):
+            stack.pop()
+            continue
+
+        if not stack:
+            item_spec = spec
+        elif isinstance(stack[-1][0], list):
+            item_spec = stack[-1][1]
+        else:
+            item_spec = stack[-1][3]
+
+        if event == "start_map":
+            container = {}
+            attach(container)
+            stack.append([container, item_spec, None, None])
+        elif event == "start_array":
+            container = []
+            attach(container)
+            stack.append([container, item_spec, None, None])
+        else:
+            attach(value)
+
+    return root
+
+
+def archive_raw_payload(provider: str, body: bytes) -> str:
+    """Write a full provider body to RAW_PAYLOAD_DIR/<provider>/<day>/ as gzip and return the path"""
+    directory = os.path.join(RAW_PAYLOAD_DIR, provider, time.strftime("%Y%m%d"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}.json.gz")
+    with gzip.open(path, "wb", compresslevel=6) as archive:
+        archive.write(body)
+    return path
+
+
+def _declared_length(response) -> int:
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def project_response(provider: str, response) -> Any:
+    """
+    Parse a provider response keeping only the fields declared in PROVIDER_FIELDS.
+    Falls back to `response.json()` for unknown providers or when projection is disabled.
+    """
+    spec = PROVIDER_FIELDS.get(provider)
+    if not PROJECTION_ENABLED or spec is None:
+        return response.json()
+
+    try:
+        if RAW_PAYLOAD_DIR:
+            # The archive needs the whole body anyway, so parse it with the faster json.loads
+            body = response.content
+            archive_raw_payload(provider, body)
+            return project(json.loads(body), spec)
+
+        if ijson and _declared_length(response) >= STREAM_PARSE_MIN_BYTES:
+            # Requests are made with stream=True, so the body is still unread on the socket
+            response.raw.decode_content = True
+            return _stream_project(response.raw, spec)
+        return project(response.json(), spec)
+    finally:
+        response.close()
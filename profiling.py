@@ -0,0 +1,302 @@
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import html
+import threading
+import tracemalloc
+import functools
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+# Opt-in: profile every enrichment / batch run (the UI can also switch it on per run)
+PROFILING_ENABLED = os.getenv("ENABLE_PROFILING", "false").lower() == "true"
+# Profiles land in PROFILE_DIR/<YYYY-MM-DD>/ as .folded stacks, an .svg flamegraph and a .json summary
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("data", "profiles"))
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+# Track allocation sites with tracemalloc (slows allocation-heavy code while profiling)
+PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "true").lower() == "true"
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+# Seconds between checks for a new memory high-water mark (a tracemalloc snapshot is kept at the peak)
+PROFILE_MEMORY_CHECK_INTERVAL = float(os.getenv("PROFILE_MEMORY_CHECK_INTERVAL", "0.25"))
+
+# Only stacks passing through this project's code are sampled (skips idle server/event-loop threads)
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Leaf frames that mean "blocked" (network, locks, queues) rather than burning CPU.
+# Blocking C calls made directly from other code (e.g. time.sleep) still count as on-CPU in their caller.
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "readinto"),
+    ("socket.py", "create_connection"),
+    ("ssl.py", "read"),
+    ("ssl.py", "recv_into"),
+    ("ssl.py", "do_handshake"),
+    ("connection.py", "create_connection"),
+    ("sync.py", "read"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_session_lock = threading.Lock()
+_active_session: Optional["ProfileSession"] = None
+
+
+def _short_path(filename: str) -> str:
+    return os.path.relpath(filename, PROJECT_ROOT) if filename.startswith(PROJECT_ROOT) else os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples every thread's Python stack at a fixed interval (wall clock)"""
+
+    def __init__(self, interval: float, track_allocations: bool = False):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.track_allocations = track_allocations
+        self.peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_bytes = 0
+        self.stacks: Counter = Counter()     # folded stack -> samples
+        self.cpu_sites: Counter = Counter()  # leaf line -> samples spent on-CPU
+        self.functions: Counter = Counter()  # project function -> on-CPU samples inside it (inclusive)
+        self.samples = 0
+        self.idle_samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        next_memory_check = 0.0
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+            if self.track_allocations and time.time() >= next_memory_check:
+                self._check_memory()
+                next_memory_check = time.time() + PROFILE_MEMORY_CHECK_INTERVAL
+
+    def _check_memory(self) -> None:
+        """Keep a snapshot of live allocations whenever traced memory reaches a new high (>10% above the last)"""
+        if not tracemalloc.is_tracing():
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self._peak_bytes * 1.1:
+            self.peak_snapshot = tracemalloc.take_snapshot()
+            self._peak_bytes = current
+
+    def _sample(self) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.ident:
+                continue
+            labels, project_functions = [], set()
+            leaf = frame
+            while frame is not None:
+                label = _frame_label(frame.f_code)
+                labels.append(label)
+                if frame.f_code.co_filename.startswith(PROJECT_ROOT):
+                    project_functions.add(label)
+                frame = frame.f_back
+            if not project_functions:
+                continue
+
+            idle = (os.path.basename(leaf.f_code.co_filename), leaf.f_code.co_name) in IDLE_LEAVES
+            labels.reverse()
+            if idle:
+                labels.append("[waiting]")
+                self.idle_samples += 1
+            else:
+                self.cpu_sites[f"{leaf.f_code.co_name} ({_short_path(leaf.f_code.co_filename)}:{leaf.f_lineno})"] += 1
+                self.functions.update(project_functions)
+            self.stacks[";".join(labels)] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _flamegraph_svg(stacks: Counter, title: str, width: int = 1200, row_height: int = 16) -> str:
+    """Render folded stacks as a self-contained SVG flamegraph (root on top, hover for details)"""
+    tree: Dict[str, Any] = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = tree
+        node["count"] += count
+        for label in stack.split(";"):
+            node = node["children"].setdefault(label, {"count": 0, "children": {}})
+            node["count"] += count
+
+    total = tree["count"] or 1
+    rects, max_depth = [], 0
+
+    def walk(node, x, depth):
+        nonlocal max_depth
+        for label, child in sorted(node["children"].items()):
+            child_width = child["count"] / total * width
+            if child_width >= 0.5:
+                max_depth = max(max_depth, depth)
+                y = 30 + depth * row_height
+                shade = zlib.crc32(label.encode("utf-8"))
+                color = "#9ecae1" if label == "[waiting]" else f"hsl({shade % 40 + 5}, 85%, {55 + shade % 15}%)"
+                text = html.escape(label)
+                tooltip = f"{text} - {child['count']} samples ({child['count'] / total:.1%})"
+                rects.append(
+                    f'<g><title>{tooltip}</title><rect x="{x:.1f}" y="{y}" width="{child_width:.1f}" '
+                    f'height="{row_height - 1}" fill="{color}" rx="2"/>'
+                    + (f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{text[:int(child_width / 7)]}</text>'
+                       if child_width > 35 else "")
+                    + "</g>"
+                )
+                walk(child, x, depth + 1)
+            x += child_width
+
+    walk(tree, 0.0, 0)
+    height = 40 + (max_depth + 1) * row_height
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'style="font-family: Verdana, sans-serif; font-size: 11px;">'
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14">{html.escape(title)}</text>'
+        + "".join(rects) + "</svg>"
+    )
+
+
+class ProfileSession:
+    """One profiled run: stack sampling + optional allocation tracking, written to disk on stop()"""
+
+    def __init__(self, label: str, directory: Optional[str] = None, interval: float = PROFILE_INTERVAL,
+                 track_allocations: bool = PROFILE_TRACEMALLOC):
+        self.label = label
+        self.directory = directory or os.path.join(PROFILE_DIR, time.strftime("%Y-%m-%d"))
+        self.run_id = f"{label}_{time.strftime('%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.track_allocations = track_allocations
+        self.report: Optional[Dict[str, Any]] = None
+        self._sampler = _StackSampler(interval, track_allocations)
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+        self._started_at = time.time()
+        self._sampler.start()
+
+    def _allocation_sites(self) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Live allocations by line at the highest memory point seen during the run"""
+        if not self.track_allocations or not tracemalloc.is_tracing():
+            return [], None
+        self._sampler._check_memory()
+        snapshot = self._sampler.peak_snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        sites = [
+            {
+                "site": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP_N]
+        ]
+        return sites, round(peak_kb, 1)
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling, write the profile files and return the summary report"""
+        self._sampler.stop()
+        duration = time.time() - self._started_at
+        allocation_sites, peak_kb = self._allocation_sites()
+        sampler = self._sampler
+        cpu_samples = sampler.samples - sampler.idle_samples
+        share_of = max(cpu_samples, 1)
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.run_id)
+        files = {"folded": base + ".folded", "flamegraph": base + ".svg", "summary": base + ".json"}
+        with open(files["folded"], "w", encoding="utf-8") as folded_file:
+            folded_file.writelines(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common())
+        with open(files["flamegraph"], "w", encoding="utf-8") as svg_file:
+            svg_file.write(_flamegraph_svg(sampler.stacks, f"{self.label} - {duration:.2f}s, {sampler.samples} samples"))
+
+        self.report = {
+            "label": self.label,
+            "run_id": self.run_id,
+            "started_at": self._started_at,
+            "duration_seconds": round(duration, 3),
+            "interval_seconds": sampler.interval,
+            "samples": sampler.samples,
+            "cpu_samples": cpu_samples,
+            "waiting_samples": sampler.idle_samples,
+            "top_cpu_sites": [
+                {"site": site, "samples": count, "share": round(count / share_of, 3)}
+                for site, count in sampler.cpu_sites.most_common(PROFILE_TOP_N)
+            ],
+            "top_functions": [
+                {"function": label, "samples": count, "share": round(count / share_of, 3)}
+                for label, count in sampler.functions.most_common(PROFILE_TOP_N)
+            ],
+            "top_allocation_sites": allocation_sites,
+            "peak_traced_kb": peak_kb,
+            "files": files,
+        }
+        with open(files["summary"], "w", encoding="utf-8") as summary_file:
+            json.dump(self.report, summary_file, indent=2)
+
+        print(f"🔬 Profile {self.run_id}: {duration:.2f}s, {sampler.samples} samples "
+              f"({cpu_samples} on-CPU, {sampler.idle_samples} waiting) -> {files['flamegraph']}")
+        for entry in self.report["top_cpu_sites"][:5]:
+            print(f"   🔥 {entry['share']:.0%} {entry['site']}")
+        return self.report
+
+
+@contextmanager
+def profile_run(label: str, enabled: Optional[bool] = None):
+    """
+    Profile the enclosed block when `enabled` (default: ENABLE_PROFILING); yields the session or None.
+    One session runs at a time - nested or concurrent runs are sampled into the active one.
+    """
+    global _active_session
+    if not (PROFILING_ENABLED if enabled is None else enabled):
+        yield None
+        return
+    with _session_lock:
+        if _active_session is not None:
+            session = None
+        else:
+            session = _active_session = ProfileSession(label)
+    if session is None:
+        yield None
+        return
+
+    try:
+        session.start()
+        yield session
+    finally:
+        try:
+            session.stop()
+        except Exception as e:
+            print(f"⚠️ Profiling error: {e}")
+        finally:
+            with _session_lock:
+                _active_session = None
+
+
+def profiled(label: str):
+    """Decorator: run the function under profile_run(label) when profiling is enabled"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,293 @@
+import os
+import re
+import html
+from datetime import datetime
+from functools import lru_cache
+from string import Template
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import markdown as _markdown  # Optional: full Markdown support
+except ImportError:
+    _markdown = None
+
+# Digest mode: leads rendered with an analysis excerpt (the rest are listed in the summary table)
+DIGEST_MAX_DETAILED = int(os.getenv("DIGEST_MAX_DETAILED", "50"))
+# Characters of each lead's analysis shown in the digest
+DIGEST_EXCERPT_CHARS = int(os.getenv("DIGEST_EXCERPT_CHARS", "800"))
+
+# Templates are parsed once at import and only substituted per send
+_PAGE = Template("""
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h1 style="color: #1f77b4; border-bottom: 2px solid #1f77b4;">$title</h1>
+    $content
+    <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
+
+    <div style="text-align: center; color: #6c757d; font-size: 12px;">
+        <p><strong>Generated by AI Lead Enrichment Stack</strong></p>
+        <p>🤖 Powered by ChatGPT + Multiple APIs</p>
+        <p>PeopleDataLabs • Apollo.io • Hunter.io • SERP API</p>
+    </div>
+</body>
+</html>
+""")
+
+_LEAD_INFO = Template("""
+    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
+        <h3>📋 Lead Information</h3>
+        <p><strong>Name:</strong> $name</p>
+        <p><strong>Company:</strong> $company</p>
+        <p><strong>Data Sources:</strong> $sources</p>
+    </div>
+""")
+
+_ANALYSIS = Template("""
+    <h3 style="color: #28a745;">🧠 ChatGPT Analysis</h3>
+    <div style="background-color: #e9ecef; padding: 15px; border-radius: 8px; border-left: 4px solid #28a745;">
+        $analysis
+    </div>
+""")
+
+_HUNTER_EMAILS = Template("""
+    <h3 style="color: #dc3545;">📧 Hunter.io Discovered Emails</h3>
+    <div style="background-color: #fff3cd; padding: 15px; border-radius: 8px; border-left: 4px solid #ffc107;">
+        <ol>$items</ol>
+    </div>
+""")
+
+_HUNTER_EMAIL_ITEM = Template("<li>$name ($email) - $position - Confidence: $confidence%</li>")
+
+_DIGEST_SUMMARY = Template("""
+    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
+        <h3>📦 Batch Summary</h3>
+        <p><strong>Leads:</strong> $total &nbsp;•&nbsp; <strong>Enriched:</strong> $enriched &nbsp;•&nbsp; <strong>Failed:</strong> $failed &nbsp;•&nbsp; <strong>Hunter.io emails:</strong> $emails</p>
+    </div>
+    <table style="border-collapse: collapse; width: 100%; font-size: 13px;">
+        <tr style="background-color: #1f77b4; color: #fff;">
+            <th style="padding: 6px; text-align: left;">#</th>
+            <th style="padding: 6px; text-align: left;">Name</th>
+            <th style="padding: 6px; text-align: left;">Company</th>
+            <th style="padding: 6px; text-align: left;">Title</th>
+            <th style="padding: 6px; text-align: left;">Emails</th>
+            <th style="padding: 6px; text-align: left;">Status</th>
+        </tr>
+        $rows
+    </table>
+""")
+
+_DIGEST_ROW = Template("""
+        <tr style="border-bottom: 1px solid #dee2e6;">
+            <td style="padding: 6px;">$index</td><td style="padding: 6px;">$name</td><td style="padding: 6px;">$company</td>
+            <td style="padding: 6px;">$title</td><td style="padding: 6px;">$emails</td><td style="padding: 6px;">$status</td>
+        </tr>""")
+
+_DIGEST_LEAD = Template("""
+    <div style="margin: 20px 0; padding: 15px; border-radius: 8px; border-left: 4px solid #28a745; background-color: #e9ecef;">
+        <h3 style="margin-top: 0;">$index. $name <span style="color: #6c757d; font-weight: normal;">- $company</span></h3>
+        $analysis
+    </div>
+""")
+
+
+def _escape(value: Any, default: str = "N/A") -> str:
+    return html.escape(str(value)) if value not in (None, "") else default
+
+
+_INLINE_RULES = [
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)"), r"<em>\1</em>"),
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)"), r'<a href="\2">\1</a>'),
+]
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    for pattern, replacement in _INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+_HEADING = re.compile(r"(#{1,6})\s+(.*)")
+_LIST_ITEM = re.compile(r"(?:([-*•])|(\d+)[.)])\s+")
+
+
+def _list_kind(line: str) -> Optional[str]:
+    item = _LIST_ITEM.match(line)
+    return None if not item else "ul" if item.group(1) else "ol"
+
+
+def _normalize_markdown(text: str) -> str:
+    """
+    Prepare model output for either renderer: headings move two levels down (below the report title),
+    "•" and "1)" markers become "-" and "1.", and a blank line goes wherever a list starts, ends or
+    switches between bullets and numbers - ChatGPT often starts one right under a "**Label:**" line.
+    """
+    lines, previous_kind, previous_blank = [], None, True
+    for line in text.splitlines():
+        stripped = line.strip()
+        if line[:1].isspace() and stripped and not previous_blank:
+            lines.append(line)  # Continuation of the previous line or list item
+            continue
+        heading = _HEADING.match(stripped)
+        kind = _list_kind(stripped)
+        if heading:
+            line = "#" * min(len(heading.group(1)) + 2, 6) + " " + heading.group(2)
+        elif kind:
+            item = _LIST_ITEM.match(stripped)
+            line = ("- " if kind == "ul" else item.group(2) + ". ") + stripped[item.end():]
+        if stripped and not previous_blank and kind != previous_kind:
+            lines.append("")
+        lines.append(line)
+        previous_kind, previous_blank = kind, not stripped
+    return "\n".join(lines)
+
+
+def _basic_markdown(text: str) -> str:
+    """Small Markdown subset (headings, lists, emphasis, links) for when python-markdown isn't installed"""
+    blocks, list_tag, paragraph = [], None, []
+
+    def close_paragraph():
+        if paragraph:
+            blocks.append("<p>" + "<br>".join(paragraph) + "</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            blocks.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = _HEADING.match(stripped)
+        bullet = re.match(r"[-*•]\s+(.*)", stripped)
+        numbered = re.match(r"\d+[.)]\s+(.*)", stripped)
+        if not stripped:
+            close_paragraph()
+            close_list()
+        elif heading:
+            close_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif bullet or numbered:
+            close_paragraph()
+            tag = "ul" if bullet else "ol"
+            if list_tag != tag:
+                close_list()
+                blocks.append(f"<{tag}>")
+                list_tag = tag
+            blocks.append(f"<li>{_inline((bullet or numbered).group(1))}</li>")
+        elif list_tag and line[:1].isspace():
+            blocks[-1] = blocks[-1][:-len("</li>")] + "<br>" + _inline(stripped) + "</li>"  # Continued item
+        else:
+            close_list()
+            paragraph.append(_inline(stripped))
+    close_paragraph()
+    close_list()
+    return "\n".join(blocks)
+
+
+@lru_cache(maxsize=1024)
+def markdown_to_html(text: str) -> str:
+    """Convert ChatGPT's Markdown analysis to email-safe HTML (memoized - digests reuse lead analyses)"""
+    if not text:
+        return ""
+    text = _normalize_markdown(text)
+    if _markdown:
+        # Raw HTML in the model output is escaped rather than passed through
+        return _markdown.markdown(html.escape(text, quote=False), extensions=["sane_lists", "nl2br"])
+    return _basic_markdown(text)
+
+
+def _hunter_items(hunter_emails: List[Dict[str, Any]], limit: int = 5) -> str:
+    items = []
+    for email_data in hunter_emails[:limit]:
+        if not isinstance(email_data, dict):
+            continue
+        items.append(_HUNTER_EMAIL_ITEM.substitute(
+            name=_escape(f"{email_data.get('first_name') or ''} {email_data.get('last_name') or ''}".strip(), ""),
+            email=_escape(email_data.get("value")),
+            position=_escape(email_data.get("position")),
+            confidence=_escape(email_data.get("confidence")),
+        ))
+    return "".join(items)
+
+
+def render_lead_report(lead_data: Dict[str, Any], name: str = "", company: Optional[str] = None) -> Tuple[str, str]:
+    """Render the single-lead email report; returns (subject, html body)"""
+    lead_name = lead_data.get("lead_name", name)
+    content = _LEAD_INFO.substitute(
+        name=_escape(lead_name),
+        company=_escape(lead_data.get("company_name", company)),
+        sources=_escape(", ".join(lead_data.get("data_sources", [])), ""),
+    )
+    content += _ANALYSIS.substitute(analysis=markdown_to_html(lead_data.get("ai_analysis") or "No analysis available"))
+    if lead_data.get("hunter_emails"):
+        content += _HUNTER_EMAILS.substitute(items=_hunter_items(lead_data["hunter_emails"]))
+
+    subject = f"Lead Enrichment Report: {lead_name}"
+    return subject, _PAGE.substitute(title="🎯 AI Lead Enrichment Report", content=content)
+
+
+def _excerpt(analysis: str, limit: int = DIGEST_EXCERPT_CHARS) -> str:
+    """Cut an analysis at a paragraph/line boundary near `limit` characters"""
+    if len(analysis) <= limit:
+        return analysis
+    cut = analysis.rfind("\n", 0, limit)
+    return analysis[:cut if cut > limit // 2 else limit].rstrip() + "\n\n…"
+
+
+def render_digest(
+    results: List[Dict[str, Any]],
+    leads: Optional[List[Dict[str, Any]]] = None,
+    title: Optional[str] = None
+) -> Tuple[str, str]:
+    """Render one email summarizing a whole batch; returns (subject, html body)"""
+    leads = leads or [{} for _ in results]
+    rows, details = [], []
+    enriched = failed = total_emails = 0
+
+    for index, (result, lead) in enumerate(zip(results, leads), 1):
+        lead_name = result.get("lead_name") or lead.get("name")
+        company = result.get("company_name") or lead.get("company")
+        raw = result.get("raw_api_data") or {}
+        person = (raw.get("peopledatalabs") or {}).get("data") or {}
+        apollo_person = (raw.get("apollo") or {}).get("person") or {}
+        job_title = (person.get("job_title") if isinstance(person, dict) else None) \
+            or (apollo_person.get("title") if isinstance(apollo_person, dict) else None)
+        email_count = len(result.get("hunter_emails") or [])
+        total_emails += email_count
+
+        if "error" in result and "ai_analysis" not in result:
+            failed += 1
+            status = "❌ Failed"
+        else:
+            enriched += 1
+            status = "✅ Enriched"
+            if len(details) < DIGEST_MAX_DETAILED and result.get("ai_analysis"):
+                details.append(_DIGEST_LEAD.substitute(
+                    index=index,
+                    name=_escape(lead_name),
+                    company=_escape(company),
+                    analysis=markdown_to_html(_excerpt(result["ai_analysis"])),
+                ))
+
+        rows.append(_DIGEST_ROW.substitute(
+            index=index, name=_escape(lead_name), company=_escape(company),
+            title=_escape(job_title), emails=email_count, status=status,
+        ))
+
+    content = _DIGEST_SUMMARY.substitute(
+        total=len(results), enriched=enriched, failed=failed, emails=total_emails, rows="".join(rows),
+    )
+    if details:
+        content += '\n    <h3 style="color: #28a745;">🧠 Lead Highlights</h3>' + "".join(details)
+        if enriched > len(details):
+            content += f"\n    <p style=\"color: #6c757d;\">+ {enriched - len(details)} more enriched lead(s) in the table above.</p>"
+
+    title = title or f"📦 Lead Enrichment Digest - {datetime.now().strftime('%Y-%m-%d')}"
+    subject = f"Lead Enrichment Digest: {len(results)} leads ({enriched} enriched)"
+    return subject, _PAGE.substitute(title=html.escape(title), content=content)
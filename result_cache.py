@@ -0,0 +1,58 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable
+
+# Process-level memo of finished enrichments (shared by every browser session)
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+
+
+def lead_cache_key(
+    name: str,
+    email: Optional[str] = None,
+    company: Optional[str] = None,
+    domain: Optional[str] = None,
+    priority: str = "normal"
+) -> tuple:
+    """Normalize lead inputs so trivially different spellings share one entry"""
+    def norm(value):
+        return " ".join(value.lower().split()) if value else ""
+    return (norm(name), norm(email), norm(company), norm(domain), priority or "normal")
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, ttl: int = RESULT_CACHE_TTL, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+lead_result_cache = ResultCache()
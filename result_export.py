@@ -0,0 +1,270 @@
+import os
+import io
+import csv
+import json
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export needs pyarrow (bundled with Streamlit)
+    pa = None
+    pq = None
+
+# Exports land in EXPORT_DIR/<YYYY-MM-DD>/ so a day's output loads as one dataset
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join("data", "exports"))
+# Rows buffered per Parquet row group / CSV flush
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "1000"))
+
+# Columnar schema: one row per lead ...
+LEAD_COLUMNS: List[Tuple[str, str]] = [
+    ("lead_id", "string"),
+    ("lead_name", "string"),
+    ("company_name", "string"),
+    ("input_email", "string"),
+    ("input_domain", "string"),
+    ("priority", "string"),
+    ("status", "string"),
+    ("error", "string"),
+    ("job_title", "string"),
+    ("job_company", "string"),
+    ("industry", "string"),
+    ("location", "string"),
+    ("linkedin_url", "string"),
+    ("twitter_url", "string"),
+    ("work_email", "string"),
+    ("phone", "string"),
+    ("data_sources", "string"),
+    ("hunter_email_count", "int64"),
+    ("email_pattern", "string"),
+    ("company_profile_key", "string"),
+    ("model", "string"),
+    ("model_reason", "string"),
+    ("richness_score", "int64"),
+    ("prompt_tokens", "int64"),
+    ("completion_tokens", "int64"),
+    ("estimated_cost_usd", "float64"),
+    ("ai_analysis", "string"),
+    ("exported_at", "float64"),
+]
+
+# ... and one row per Hunter.io email, joined to its lead on lead_id ("<run id>:<row index>")
+EMAIL_COLUMNS: List[Tuple[str, str]] = [
+    ("lead_id", "string"),
+    ("lead_name", "string"),
+    ("company_name", "string"),
+    ("email", "string"),
+    ("first_name", "string"),
+    ("last_name", "string"),
+    ("position", "string"),
+    ("department", "string"),
+    ("seniority", "string"),
+    ("confidence", "int64"),
+    ("linkedin", "string"),
+    ("verification_status", "string"),
+    ("verification_date", "string"),
+]
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (list, dict)):
+        return json.dumps(value) if isinstance(value, dict) else ", ".join(str(item) for item in value if item is not None)
+    return str(value)
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def flatten_result(
+    result: Dict[str, Any],
+    lead: Optional[Dict[str, Any]] = None,
+    lead_id: Optional[str] = None
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Flatten one enrichment result into a lead row and its Hunter.io email rows, both keyed by `lead_id`"""
+    lead = lead or {}
+    raw = result.get("raw_api_data") or {}
+    ppld = raw.get("peopledatalabs") or {}
+    person = ppld.get("data") if isinstance(ppld.get("data"), dict) else {}
+    apollo = raw.get("apollo") or {}
+    apollo_person = apollo.get("person") if isinstance(apollo.get("person"), dict) else {}
+    hunter = raw.get("hunter") or {}
+    hunter_data = hunter.get("data") if isinstance(hunter.get("data"), dict) else {}
+    routing = result.get("model_routing") or {}
+    usage = routing.get("usage") or {}
+    hunter_emails = result.get("hunter_emails") or []
+
+    lead_name = result.get("lead_name") or lead.get("name")
+    company_name = result.get("company_name") or lead.get("company")
+    failed = "error" in result and "ai_analysis" not in result
+
+    lead_row = {
+        "lead_id": lead_id,
+        "lead_name": _text(lead_name),
+        "company_name": _text(company_name),
+        "input_email": _text(lead.get("email")),
+        "input_domain": _text(lead.get("domain")),
+        "priority": _text(lead.get("priority") or routing.get("priority")),
+        "status": "failed" if failed else ("partial" if "error" in result else "enriched"),
+        "error": _text(result.get("error")),
+        "job_title": _text(person.get("job_title") or apollo_person.get("title")),
+        "job_company": _text(person.get("job_company_name")),
+        "industry": _text(person.get("industry")),
+        "location": _text(person.get("location_names") or apollo_person.get("city")),
+        "linkedin_url": _text(person.get("linkedin_url") or apollo_person.get("linkedin_url")),
+        "twitter_url": _text(person.get("twitter_url") or apollo_person.get("twitter_url")),
+        "work_email": _text(apollo_person.get("email")),
+        "phone": _text(apollo_person.get("phone")),
+        "data_sources": _text(result.get("data_sources") or list(raw.keys())),
+        "hunter_email_count": len(hunter_emails),
+        "email_pattern": _text(hunter_data.get("pattern")),
+        "company_profile_key": _text((result.get("company_profile") or {}).get("key")),
+        "model": _text(routing.get("model")),
+        "model_reason": _text(routing.get("reason")),
+        "richness_score": _int(routing.get("richness_score")),
+        "prompt_tokens": _int(usage.get("prompt_tokens")),
+        "completion_tokens": _int(usage.get("completion_tokens")),
+        "estimated_cost_usd": usage.get("estimated_cost_usd"),
+        "ai_analysis": _text(result.get("ai_analysis")),
+        "exported_at": time.time(),
+    }
+
+    email_rows = []
+    for email_data in hunter_emails:
+        if not isinstance(email_data, dict):
+            continue
+        verification = email_data.get("verification") if isinstance(email_data.get("verification"), dict) else {}
+        email_rows.append({
+            "lead_id": lead_id,
+            "lead_name": lead_row["lead_name"],
+            "company_name": lead_row["company_name"],
+            "email": _text(email_data.get("value")),
+            "first_name": _text(email_data.get("first_name")),
+            "last_name": _text(email_data.get("last_name")),
+            "position": _text(email_data.get("position")),
+            "department": _text(email_data.get("department")),
+            "seniority": _text(email_data.get("seniority")),
+            "confidence": _int(email_data.get("confidence")),
+            "linkedin": _text(email_data.get("linkedin")),
+            "verification_status": _text(verification.get("status")),
+            "verification_date": _text(verification.get("date")),
+        })
+    return lead_row, email_rows
+
+
+def _arrow_schema(columns: List[Tuple[str, str]]):
+    return pa.schema([(name, getattr(pa, dtype)()) for name, dtype in columns])
+
+
+class _TableWriter:
+    """Appends buffered rows to one Parquet or CSV file"""
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]], fmt: str):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+        self._file = None
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        self._buffer.extend(rows)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        names = [name for name, _ in self.columns]
+        if self.fmt == "parquet":
+            schema = _arrow_schema(self.columns)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema, compression="zstd")
+            table = pa.Table.from_pylist(self._buffer, schema=schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.path, "w", newline="", encoding="utf-8")
+                self._writer = csv.DictWriter(self._file, fieldnames=names, extrasaction="ignore")
+                self._writer.writeheader()
+            self._writer.writerows(self._buffer)
+            self._file.flush()
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.fmt == "parquet" and self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class ResultExporter:
+    """
+    Incrementally export enrichment results while a batch runs.
+    Writes `leads_<run>.<ext>` and `hunter_emails_<run>.<ext>`, one row group per EXPORT_ROW_GROUP_SIZE leads.
+    Rows are keyed by `lead_id` = "<run id>:<input row index>", unique across runs.
+    """
+
+    def __init__(self, fmt: str = "parquet", directory: Optional[str] = None, row_group_size: int = EXPORT_ROW_GROUP_SIZE):
+        if fmt not in ("parquet", "csv"):
+            raise ValueError("Export format must be 'parquet' or 'csv'")
+        if fmt == "parquet" and pq is None:
+            raise ImportError("Parquet export requires pyarrow - install it or export as CSV")
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.directory = directory or os.path.join(EXPORT_DIR, time.strftime("%Y-%m-%d"))
+        os.makedirs(self.directory, exist_ok=True)
+        self.run_id = run_id = new_run_id()
+        self.leads = _TableWriter(os.path.join(self.directory, f"leads_{run_id}.{fmt}"), LEAD_COLUMNS, fmt)
+        self.emails = _TableWriter(os.path.join(self.directory, f"hunter_emails_{run_id}.{fmt}"), EMAIL_COLUMNS, fmt)
+        self._pending = 0
+        self._added = 0
+
+    def add(self, result: Dict[str, Any], lead: Optional[Dict[str, Any]] = None, index: Optional[int] = None) -> None:
+        """Queue one result; `index` is its row in the input (defaults to the order of add() calls)"""
+        lead_id = f"{self.run_id}:{self._added if index is None else index}"
+        self._added += 1
+        lead_row, email_rows = flatten_result(result, lead, lead_id)
+        self.leads.add([lead_row])
+        self.emails.add(email_rows)
+        self._pending += 1
+        if self._pending >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.leads.flush()
+        self.emails.flush()
+        self._pending = 0
+
+    def close(self) -> Dict[str, str]:
+        """Flush remaining rows and return the written file paths"""
+        self.leads.close()
+        self.emails.close()
+        print(f"💾 Exported {self.leads.rows_written} leads / {self.emails.rows_written} emails to {self.directory}")
+        paths = {"leads": self.leads.path}
+        if self.emails.rows_written:
+            paths["hunter_emails"] = self.emails.path
+        return paths
+
+
+def results_to_csv_bytes(results: List[Dict[str, Any]], leads: Optional[List[Dict[str, Any]]] = None) -> bytes:
+    """Flatten results into an in-memory CSV of lead rows (for download buttons)"""
+    run_id = new_run_id()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[name for name, _ in LEAD_COLUMNS])
+    writer.writeheader()
+    for index, result in enumerate(results):
+        writer.writerow(flatten_result(result, leads[index] if leads else None, f"{run_id}:{index}")[0])
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,316 @@
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Mapping, Optional
+
+INTERACTIVE = "interactive"
+HIGH_VALUE = "high_value"
+BULK = "bulk"
+SCHEDULE_CLASSES = (INTERACTIVE, HIGH_VALUE, BULK)
+
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into {"a": "1", "b": "2"}"""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): val.strip() for key, val in pairs}
+
+
+# Provider/LLM calls go through per-resource slots, handed out by weighted fair queuing
+SCHEDULER_ENABLED = os.getenv("ENABLE_SCHEDULER", "true").lower() in ("1", "true", "yes")
+# Share of contended slots per class (interactive preempts queued bulk work)
+SCHEDULER_WEIGHTS = {INTERACTIVE: 100.0, HIGH_VALUE: 10.0, BULK: 1.0}
+SCHEDULER_WEIGHTS.update({
+    cls: float(weight) for cls, weight in _parse_mapping(os.getenv("SCHEDULER_WEIGHTS", "")).items()
+    if cls in SCHEDULE_CLASSES
+})
+# Slots (and rate-budget calls) per resource that only interactive calls may use
+SCHEDULER_INTERACTIVE_RESERVE = int(os.getenv("SCHEDULER_INTERACTIVE_RESERVE", "1"))
+# Concurrent calls per provider (and per LLM), overridable per resource e.g. "serpapi=2,openai=16".
+# By default as many as the API job pool or a Streamlit batch can issue, plus the interactive reserve,
+# so slots never throttle batch work below its own concurrency - the rate budgets do the limiting.
+SCHEDULER_DEFAULT_SLOTS = int(os.getenv("SCHEDULER_DEFAULT_SLOTS") or max(
+    int(os.getenv("API_MAX_CONCURRENCY", "8")), int(os.getenv("BATCH_MAX_WORKERS", "4"))
+) + SCHEDULER_INTERACTIVE_RESERVE)
+SCHEDULER_SLOTS = {resource: int(slots) for resource, slots in _parse_mapping(os.getenv("SCHEDULER_SLOTS", "")).items()}
+# Calls per second each resource may start, handed out by the same fair queuing, e.g. "serpapi=5,peopledatalabs=1.5"
+SCHEDULER_RATE_LIMITS = {
+    resource: float(rate) for resource, rate in _parse_mapping(os.getenv("SCHEDULER_RATE_LIMITS", "")).items()
+}
+# Seconds non-interactive calls pause after a provider answers 429 without a Retry-After header
+SCHEDULER_BACKOFF_SECONDS = float(os.getenv("SCHEDULER_BACKOFF_SECONDS", "30"))
+# A longer Retry-After means the quota is gone rather than throttled - the circuit breaker handles that
+SCHEDULER_MAX_BACKOFF_SECONDS = float(os.getenv("SCHEDULER_MAX_BACKOFF_SECONDS", "300"))
+# Times a rate-limited call is re-queued behind the backoff before it fails
+SCHEDULER_RATE_LIMIT_RETRIES = int(os.getenv("SCHEDULER_RATE_LIMIT_RETRIES", "3"))
+
+_current_class = contextvars.ContextVar("schedule_class", default=None)
+
+
+def schedule_class_for(priority: Optional[str]) -> str:
+    """Class of non-interactive work: high-priority leads are high-value, everything else is bulk"""
+    return HIGH_VALUE if priority == "high" else BULK
+
+
+def current_schedule_class() -> str:
+    return _current_class.get() or BULK
+
+
+@contextmanager
+def schedule_context(schedule_class: Optional[str]):
+    """Schedule every provider/LLM call inside the block as `schedule_class` (None keeps the current one)"""
+    if schedule_class is not None and schedule_class not in SCHEDULE_CLASSES:
+        raise ValueError(f"Schedule class must be one of {', '.join(SCHEDULE_CLASSES)}")
+    token = _current_class.set(schedule_class or _current_class.get())
+    try:
+        yield
+    finally:
+        _current_class.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("schedule_class", "finish_tag", "enqueued_at", "grant", "granted")
+
+    def __init__(self, schedule_class: str, finish_tag: float, grant: Callable[[], None]):
+        self.schedule_class = schedule_class
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.time()
+        self.grant = grant
+        self.granted = False
+
+
+class SlotScheduler:
+    """
+    Weighted fair queuing over a fixed number of call slots for one resource, optionally under a
+    calls-per-second budget (token bucket).
+    Each waiter gets a virtual finish tag (start + 1/weight, self-clocked); a freed slot or budget token
+    goes to the eligible class whose oldest waiter has the smallest tag. Idle classes earn no credit, so
+    bulk work gets every slot back as soon as interactive requests stop. After a 429, non-interactive
+    classes back off while interactive calls keep their reserve.
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        slots: int,
+        interactive_reserve: int = SCHEDULER_INTERACTIVE_RESERVE,
+        rate: Optional[float] = None
+    ):
+        self.resource = resource
+        self.slots = max(slots, 1)
+        self.interactive_reserve = min(max(interactive_reserve, 0), self.slots - 1)
+        self.rate = rate if rate and rate > 0 else None
+        # Up to a second of calls can burst, always leaving room for the interactive reserve
+        self.burst = max(self.rate or 0.0, 1.0 + self.interactive_reserve)
+        self.in_use = 0
+        self.backoffs = 0
+        self._tokens = self.burst
+        self._refilled_at = time.time()
+        self._backoff_until = 0.0
+        self._wake_at: Optional[float] = None
+        self._queues = {cls: deque() for cls in SCHEDULE_CLASSES}
+        self._last_finish = {cls: 0.0 for cls in SCHEDULE_CLASSES}
+        self._virtual_time = 0.0
+        self._granted = {cls: 0 for cls in SCHEDULE_CLASSES}
+        self._wait_total = {cls: 0.0 for cls in SCHEDULE_CLASSES}
+        self._wait_max = {cls: 0.0 for cls in SCHEDULE_CLASSES}
+        self._lock = threading.Lock()
+
+    def _limit(self, schedule_class: str) -> int:
+        return self.slots if schedule_class == INTERACTIVE else self.slots - self.interactive_reserve
+
+    def _tokens_needed(self, schedule_class: str) -> float:
+        return 1.0 if schedule_class == INTERACTIVE else 1.0 + self.interactive_reserve
+
+    def _ready_at(self, schedule_class: str, now: float) -> float:
+        """Earliest time a call of this class may start, given backoff and the rate budget"""
+        ready_at = now if schedule_class == INTERACTIVE else max(now, self._backoff_until)
+        if self.rate and self._tokens < self._tokens_needed(schedule_class):
+            ready_at = max(ready_at, now + (self._tokens_needed(schedule_class) - self._tokens) / self.rate)
+        return ready_at
+
+    def _enqueue(self, schedule_class: str, grant: Callable[[], None]) -> _Waiter:
+        with self._lock:
+            start = max(self._virtual_time, self._last_finish[schedule_class])
+            waiter = _Waiter(schedule_class, start + 1.0 / SCHEDULER_WEIGHTS[schedule_class], grant)
+            self._last_finish[schedule_class] = waiter.finish_tag
+            self._queues[schedule_class].append(waiter)
+            granted = self._dispatch()
+        for granted_waiter in granted:
+            granted_waiter.grant()
+        return waiter
+
+    def _dispatch(self) -> list:
+        """Hand free slots to waiters in finish-tag order (caller holds the lock)"""
+        granted = []
+        now = time.time()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        while True:
+            eligible = [
+                queue[0] for cls, queue in self._queues.items()
+                if queue and self.in_use < self._limit(cls) and self._ready_at(cls, now) <= now
+            ]
+            if not eligible:
+                self._schedule_wake(now)
+                return granted
+            waiter = min(eligible, key=lambda candidate: candidate.finish_tag)
+            self._queues[waiter.schedule_class].popleft()
+            waiter.granted = True
+            self.in_use += 1
+            if self.rate:
+                self._tokens -= 1
+            self._virtual_time = waiter.finish_tag
+            waited = time.time() - waiter.enqueued_at
+            self._granted[waiter.schedule_class] += 1
+            self._wait_total[waiter.schedule_class] += waited
+            self._wait_max[waiter.schedule_class] = max(self._wait_max[waiter.schedule_class], waited)
+            granted.append(waiter)
+
+    def _schedule_wake(self, now: float) -> None:
+        """Re-dispatch once a waiter held back only by the rate budget or a backoff may start"""
+        waiting_on_time = [
+            self._ready_at(cls, now) for cls, queue in self._queues.items()
+            if queue and self.in_use < self._limit(cls)
+        ]
+        if not waiting_on_time:
+            return  # Nothing queued, or waiting for a slot - the next release dispatches
+        wake_at = min(waiting_on_time)
+        if self._wake_at is None or wake_at < self._wake_at:
+            self._wake_at = wake_at
+            timer = threading.Timer(max(wake_at - now, 0.001), self._wake)
+            timer.daemon = True
+            timer.start()
+
+    def _wake(self) -> None:
+        with self._lock:
+            self._wake_at = None
+            granted = self._dispatch()
+        for waiter in granted:
+            waiter.grant()
+
+    def back_off(self, seconds: float) -> None:
+        """Hold non-interactive calls for `seconds` (the provider is rate limiting us)"""
+        with self._lock:
+            self._backoff_until = max(self._backoff_until, time.time() + seconds)
+            self.backoffs += 1
+
+    def queued(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(self, schedule_class: Optional[str] = None) -> None:
+        """Block until a slot is granted"""
+        granted = threading.Event()
+        self._enqueue(schedule_class or current_schedule_class(), granted.set)
+        granted.wait()
+
+    async def acquire_async(self, schedule_class: Optional[str] = None) -> None:
+        """Wait for a slot without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(schedule_class or current_schedule_class(), grant)
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if not waiter.granted:
+                self._queues[waiter.schedule_class].remove(waiter)
+                return
+        self.release()
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+            granted = self._dispatch()
+        for waiter in granted:
+            waiter.grant()
+
+    @contextmanager
+    def slot(self, schedule_class: Optional[str] = None):
+        self.acquire(schedule_class)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resource": self.resource,
+                "slots": self.slots,
+                "in_use": self.in_use,
+                "rate_per_second": self.rate,
+                "backoffs": self.backoffs,
+                "backoff_seconds": round(max(self._backoff_until - time.time(), 0)),
+                "queued": {cls: len(queue) for cls, queue in self._queues.items()},
+                "granted": dict(self._granted),
+                "avg_wait_ms": {
+                    cls: round(self._wait_total[cls] / self._granted[cls] * 1000, 1) if self._granted[cls] else 0
+                    for cls in SCHEDULE_CLASSES
+                },
+                "max_wait_ms": {cls: round(wait * 1000, 1) for cls, wait in self._wait_max.items()},
+            }
+
+
+_schedulers: Dict[str, SlotScheduler] = {}
+_registry_lock = threading.Lock()
+
+
+def get_scheduler(resource: str) -> SlotScheduler:
+    """Process-wide slot scheduler for a provider or LLM"""
+    with _registry_lock:
+        if resource not in _schedulers:
+            _schedulers[resource] = SlotScheduler(
+                resource, SCHEDULER_SLOTS.get(resource, SCHEDULER_DEFAULT_SLOTS), rate=SCHEDULER_RATE_LIMITS.get(resource)
+            )
+        return _schedulers[resource]
+
+
+@contextmanager
+def scheduled(resource: str):
+    """Hold one of `resource`'s call slots for the block, queued by the current schedule class"""
+    if not SCHEDULER_ENABLED:
+        yield
+        return
+    with get_scheduler(resource).slot():
+        yield
+
+
+def defer_rate_limit(resource: str, headers: Optional[Mapping[str, str]] = None) -> bool:
+    """
+    Handle a 429 answered to a non-interactive call by backing off that traffic in the scheduler
+    (honouring Retry-After), so a batch hitting the rate limit doesn't open the circuit for interactive lookups.
+    Returns True when the caller should re-queue the call (it will wait out the backoff), False when it
+    should record the 429 on the circuit breaker as before.
+    """
+    schedule_class = current_schedule_class()
+    if not SCHEDULER_ENABLED or schedule_class == INTERACTIVE:
+        return False
+    try:
+        seconds = float((headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        seconds = SCHEDULER_BACKOFF_SECONDS
+    if seconds > SCHEDULER_MAX_BACKOFF_SECONDS:
+        return False
+    get_scheduler(resource).back_off(seconds)
+    print(f"🐢 {resource} rate-limited a {schedule_class} call - pausing non-interactive calls for {seconds:g}s")
+    return True
+
+
+def scheduler_states() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        schedulers = list(_schedulers.values())
+    return {scheduler.resource: scheduler.snapshot() for scheduler in schedulers}
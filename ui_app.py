@@ -1,7 +1,17 @@
 import streamlit as st
 from enrichment_engine import comprehensive_lead_enrichment
 from utils import send_email_with_gmail
+from batch_enrichment import load_leads_file, prepare_batch, run_batch_enrichment
+from circuit_breaker import breaker_states
+from result_export import ResultExporter, results_to_csv_bytes, flatten_result
+from enrichment_index import search_enrichments, get_enrichment
+from result_cache import lead_cache_key, lead_result_cache
+from report_rendering import render_lead_report, render_digest
+from profiling import profile_run, PROFILING_ENABLED
+from scheduler import INTERACTIVE
+from datetime import datetime
 import json
+import os
 
 st.set_page_config(
     page_title="AI Lead Enrichment Stack",
@@ -12,6 +22,33 @@ st.set_page_config(
 st.title("🎯 AI Lead Enrichment Stack")
 st.markdown("**Powered by ChatGPT Intelligence** - Get comprehensive lead insights from multiple APIs")
 
+# Raw payload previews are capped so one huge response can't bloat the page
+RAW_PREVIEW_MAX_CHARS = int(os.getenv("RAW_PREVIEW_MAX_CHARS", "20000"))
+
+@st.fragment
+def render_raw_payloads(raw_api_data):
+    """Serialize and send a provider payload only when the user asks for it (reruns just this fragment)"""
+    sources = list(raw_api_data.keys())
+    source = st.selectbox("Provider payload", ["Select a source..."] + sources,
+                          format_func=lambda source: source.replace("_", " ").title())
+    if source not in raw_api_data:
+        st.caption(f"{len(sources)} payload(s) available - pick one to load it.")
+        return
+    
+    data = raw_api_data[source]
+    if isinstance(data, dict) and "error" in data:
+        st.error(f"Error: {data['error']}")
+        return
+    
+    payload = json.dumps(data, indent=2, default=str)
+    if len(payload) <= RAW_PREVIEW_MAX_CHARS:
+        st.json(data, expanded=False)
+    else:
+        st.code(payload[:RAW_PREVIEW_MAX_CHARS] + "\n...", language="json")
+        st.caption(f"Preview truncated to {RAW_PREVIEW_MAX_CHARS:,} of {len(payload):,} characters.")
+    st.download_button(f"⬇️ Download full {source} payload", payload, file_name=f"{source}.json",
+                       mime="application/json", key=f"download_raw_{source}")
+
 # Sidebar for input
 with st.sidebar:
     st.header("🔍 Lead Information")
@@ -19,27 +56,135 @@ with st.sidebar:
     email = st.text_input("Email (optional)", placeholder="e.g., ceo@zomato.com")
     company = st.text_input("Company (optional)", placeholder="e.g., Zomato")
     domain = st.text_input("Company Domain (optional)", placeholder="e.g., zomato.com")
+    priority = st.selectbox("Lead Priority", ["normal", "high", "low"],
+                            help="High-priority leads are always analyzed with the large model")
+    
+    reuse_recent = st.checkbox("Reuse recent enrichment", value=True,
+                               help="Load a stored enrichment of the same lead instead of calling the APIs again")
     
     st.markdown("---")
     
     enrich_button = st.button("🚀 Enrich Lead", type="primary", use_container_width=True)
+    
+    st.markdown("---")
+    st.header("🔎 Past Enrichments")
+    search_query = st.text_input("Search names, companies, titles, emails, analysis",
+                                 placeholder="e.g., zomato founder",
+                                 on_change=lambda: st.session_state.update(active_view="search"))
+    
+    st.markdown("---")
+    st.header("📁 Batch Upload")
+    batch_file = st.file_uploader("Leads CSV (name, email, company, domain)", type=["csv"])
+    export_format = st.selectbox("Export Format", ["parquet", "csv"])
+    batch_button = st.button("📦 Enrich Batch", use_container_width=True, disabled=batch_file is None)
+    
+    st.markdown("---")
+    profile_runs = st.toggle("🔬 Profile runs", value=PROFILING_ENABLED,
+                             help="Sample CPU and allocation hot spots of each enrichment and save a flamegraph to disk")
+    
+    # Circuit breaker state per provider (only providers called in this process are listed)
+    provider_states = breaker_states()
+    if provider_states:
+        st.markdown("---")
+        with st.expander("🔌 Provider Status"):
+            state_icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+            for provider, state in provider_states.items():
+                status_line = f"{state_icons[state['state']]} **{provider}**: {state['state'].replace('_', '-')}"
+                if state["state"] == "open":
+                    status_line += f" (retry in {state['retry_in_seconds']}s)"
+                st.write(status_line)
+                if state["last_error"] and state["state"] != "closed":
+                    st.caption(state["last_error"])
 
 # Main content area
 if enrich_button and name:
-    with st.spinner("🤖 ChatGPT is analyzing data from multiple APIs..."):
-        # Get comprehensive enrichment
-        lead_data = comprehensive_lead_enrichment(
-            name=name,
-            email=email if email else None,
-            company=company if company else None,
-            domain=domain if domain else None
-        )
+    lead_inputs = {
+        "name": name,
+        "email": email if email else None,
+        "company": company if company else None,
+        "domain": domain if domain else None,
+        "priority": priority
+    }
+    cache_key = lead_cache_key(**lead_inputs)
+    lead_data = lead_result_cache.get(cache_key) if reuse_recent else None
+    if lead_data is None:
+        with st.spinner("🤖 ChatGPT is analyzing data from multiple APIs..."), \
+                profile_run("ui_lead", enabled=profile_runs) as profile:
+            # Get comprehensive enrichment
+            # Interactive lookups jump ahead of queued batch work for provider and OpenAI slots
+            lead_data = comprehensive_lead_enrichment(**lead_inputs, reuse_recent=reuse_recent,
+                                                      schedule_class=INTERACTIVE)
+        if profile and profile.report:
+            st.session_state["last_profile"] = profile.report
+        if "error" not in lead_data:
+            lead_result_cache.put(cache_key, lead_data)
+    
+    # Keep the result across reruns so Send Report, downloads and tabs never re-enrich
+    st.session_state["lead_result"] = {"inputs": lead_inputs, "data": lead_data}
+    st.session_state["active_view"] = "lead"
+elif enrich_button and not name:
+    st.error("❌ Please enter a name to enrich the lead.")
+
+# Batch enrichment
+if batch_button and batch_file is not None:
+    # Pre-validate before any paid API call
+    accepted_leads, rejected_leads, report = prepare_batch(load_leads_file(batch_file))
+    batch_results, export_paths, export_directory = [], {}, None
+    
+    if not accepted_leads.empty:
+        progress = st.progress(0.0, text="🤖 Enriching leads...")
+        completed = []
+        
+        def _update_progress(index, result):
+            completed.append(index)
+            progress.progress(len(completed) / len(accepted_leads),
+                              text=f"🤖 Enriched {len(completed)}/{len(accepted_leads)} leads")
+        
+        exporter = ResultExporter(fmt=export_format)
+        try:
+            with profile_run("ui_batch", enabled=profile_runs) as profile:
+                batch_results = run_batch_enrichment(accepted_leads, on_result=_update_progress, exporter=exporter)
+        finally:
+            export_paths = exporter.close()
+        if profile and profile.report:
+            st.session_state["last_profile"] = profile.report
+        export_directory = exporter.directory
+        progress.empty()
+    
+    # Keep the batch across reruns so downloads and follow-up actions reuse it
+    st.session_state["batch_run"] = {
+        "accepted": accepted_leads,
+        "rejected": rejected_leads,
+        "report": report,
+        "results": batch_results,
+        "export_format": export_format,
+        "export_paths": export_paths,
+        "export_directory": export_directory,
+    }
+    st.session_state["active_view"] = "batch"
+
+# Pick what the main area shows; results live in session state so they survive reruns
+active_view = st.session_state.get("active_view")
+if (active_view == "lead" and "lead_result" not in st.session_state) \
+        or (active_view == "batch" and "batch_run" not in st.session_state) \
+        or (active_view == "search" and not search_query):
+    active_view = None
+
+if active_view == "lead":
+    lead_data = st.session_state["lead_result"]["data"]
+    # Render with the inputs the result was computed for, not whatever the sidebar holds now
+    name, email, company, domain, priority = (
+        st.session_state["lead_result"]["inputs"][field] for field in ("name", "email", "company", "domain", "priority")
+    )
     
     if "error" in lead_data and "ai_analysis" not in lead_data:
         st.error(f"❌ Enrichment failed: {lead_data['error']}")
     else:
         # Display the results
         st.success("✅ Lead enrichment completed successfully!")
+        if lead_data.get("from_index"):
+            enriched_at = datetime.fromtimestamp(lead_data["from_index"]["enriched_at"]).strftime("%Y-%m-%d %H:%M")
+            st.info(f"📚 Loaded from local index (enriched {enriched_at}) - untick \"Reuse recent enrichment\" to refresh")
         
         # Show basic info
         col1, col2, col3 = st.columns(3)
@@ -51,49 +196,36 @@ if enrich_button and name:
             data_sources = lead_data.get("data_sources", [])
             st.metric("Data Sources", len(data_sources))
         
-        # Hunter.io Emails Section (if found)
+        # Shared company profile (computed once per company)
+        if lead_data.get("company_profile"):
+            with st.expander(f"🏢 Company Profile: {lead_data['company_profile'].get('key', 'N/A')}"):
+                st.markdown(lead_data["company_profile"].get("summary") or "No company summary available")
+        
+        # Hunter.io Emails Section (if found) - one table instead of a widget tree per email
         if lead_data.get("hunter_emails"):
             st.header("📧 Hunter.io Discovered Emails")
             
-            hunter_emails = lead_data["hunter_emails"]
-            
-            # Display in a nice table format
-            if hunter_emails:
-                st.write(f"Found **{len(hunter_emails)}** email(s) from the domain:")
-                
-                for i, email_data in enumerate(hunter_emails[:10], 1):  # Show first 10
-                    with st.expander(f"📧 Email {i}: {email_data.get('value', 'N/A')}", expanded=i <= 3):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.write("**👤 Contact Info:**")
-                            st.write(f"• **Name:** {email_data.get('first_name', '')} {email_data.get('last_name', '')}".strip() or 'N/A')
-                            st.write(f"• **Email:** {email_data.get('value', 'N/A')}")
-                            st.write(f"• **Position:** {email_data.get('position', 'N/A')}")
-                            st.write(f"• **Department:** {email_data.get('department', 'N/A')}")
-                            st.write(f"• **Seniority:** {email_data.get('seniority', 'N/A')}")
-                        
-                        with col2:
-                            st.write("**🔍 Verification Info:**")
-                            confidence = email_data.get('confidence', 'N/A')
-                            if confidence != 'N/A':
-                                st.write(f"• **Confidence:** {confidence}%")
-                                # Color code confidence
-                                if confidence >= 90:
-                                    st.success("🟢 High Confidence")
-                                elif confidence >= 70:
-                                    st.warning("🟡 Medium Confidence")
-                                else:
-                                    st.error("🔴 Low Confidence")
-                            
-                            linkedin_url = email_data.get('linkedin')
-                            if linkedin_url and linkedin_url != 'N/A':
-                                st.write(f"• **LinkedIn:** [Profile]({linkedin_url})")
-                            
-                            verification = email_data.get('verification', {})
-                            if verification:
-                                st.write(f"• **Verified:** {verification.get('date', 'N/A')}")
-                                st.write(f"• **Status:** {verification.get('status', 'N/A')}")
+            _, email_rows = flatten_result(lead_data)
+            st.write(f"Found **{len(email_rows)}** email(s) from the domain:")
+            st.dataframe(
+                email_rows,
+                column_order=["email", "first_name", "last_name", "position", "department", "seniority",
+                              "confidence", "verification_status", "verification_date", "linkedin"],
+                column_config={
+                    "email": st.column_config.TextColumn("📧 Email"),
+                    "first_name": "First Name",
+                    "last_name": "Last Name",
+                    "position": "Position",
+                    "department": "Department",
+                    "seniority": "Seniority",
+                    "confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=100, format="%d%%"),
+                    "verification_status": "Status",
+                    "verification_date": "Verified",
+                    "linkedin": st.column_config.LinkColumn("LinkedIn", display_text="Profile"),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
             
             st.markdown("---")
         
@@ -130,15 +262,7 @@ if enrich_button and name:
         with tab1:
             st.subheader("Raw API Data")
             if "raw_api_data" in lead_data:
-                # Show data sources that were successful
-                for source, data in lead_data["raw_api_data"].items():
-                    with st.expander(f"{source.replace('_', ' ').title()} Data"):
-                        if isinstance(data, dict) and "error" not in data:
-                            st.json(data)
-                        elif isinstance(data, dict) and "error" in data:
-                            st.error(f"Error: {data['error']}")
-                        else:
-                            st.json(data)
+                render_raw_payloads(lead_data["raw_api_data"])
         
         with tab2:
             st.subheader("Data Sources Used")
@@ -171,6 +295,23 @@ if enrich_button and name:
                             st.write(f"   🔍 Found: {total_results} search results")
                 else:
                     st.warning(f"⚠️ {source_name}: No data")
+            
+            routing = lead_data.get("model_routing")
+            if routing:
+                st.subheader("Model Routing")
+                st.write(f"🧭 **Model:** {routing.get('model')} ({routing.get('reason')})")
+                st.write(f"📈 **Input richness score:** {routing.get('richness_score')}")
+                usage = routing.get("usage")
+                if usage:
+                    st.write(f"🔢 **Tokens:** {usage['total_tokens']} (prompt {usage['prompt_tokens']}, completion {usage['completion_tokens']})")
+                    st.write(f"💲 **Estimated cost:** ${usage['estimated_cost_usd']:.4f}")
+        
+        st.download_button(
+            "⬇️ Download Lead (CSV)",
+            results_to_csv_bytes([lead_data], [{"name": name, "email": email, "company": company, "domain": domain, "priority": priority}]),
+            file_name=f"lead_{lead_data.get('lead_name', name).replace(' ', '_').lower()}.csv",
+            mime="text/csv"
+        )
         
         # Email functionality - Always available after lead enrichment
         st.markdown("---")
@@ -191,54 +332,7 @@ if enrich_button and name:
         
         if send_report_button:
             if email_recipient and email_recipient.strip():
-                # Create email content
-                email_subject = f"Lead Enrichment Report: {lead_data.get('lead_name', name)}"
-                
-                # Include Hunter emails in the report
-                hunter_emails_text = ""
-                if lead_data.get("hunter_emails"):
-                    hunter_emails_text = "\n\nHUNTER.IO DISCOVERED EMAILS:\n"
-                    for i, email_data in enumerate(lead_data["hunter_emails"][:5], 1):
-                        name_str = f"{email_data.get('first_name', '')} {email_data.get('last_name', '')}".strip()
-                        hunter_emails_text += f"{i}. {name_str} ({email_data.get('value', 'N/A')}) - {email_data.get('position', 'N/A')} - Confidence: {email_data.get('confidence', 'N/A')}%\n"
-                
-                # Format email body as HTML for better presentation
-                analysis_html = lead_data.get('ai_analysis', 'No analysis available').replace('\n', '<br>')
-                
-                email_body = f"""
-<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <h1 style="color: #1f77b4; border-bottom: 2px solid #1f77b4;">🎯 AI Lead Enrichment Report</h1>
-    
-    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
-        <h3>📋 Lead Information</h3>
-        <p><strong>Name:</strong> {lead_data.get('lead_name', name)}</p>
-        <p><strong>Company:</strong> {lead_data.get('company_name', company or 'N/A')}</p>
-        <p><strong>Data Sources:</strong> {', '.join(lead_data.get('data_sources', []))}</p>
-    </div>
-    
-    <h3 style="color: #28a745;">🧠 ChatGPT Analysis</h3>
-    <div style="background-color: #e9ecef; padding: 15px; border-radius: 8px; border-left: 4px solid #28a745;">
-        {analysis_html}
-    </div>
-    
-    {f'''
-    <h3 style="color: #dc3545;">📧 Hunter.io Discovered Emails</h3>
-    <div style="background-color: #fff3cd; padding: 15px; border-radius: 8px; border-left: 4px solid #ffc107;">
-        {hunter_emails_text.replace(chr(10), '<br>')}
-    </div>
-    ''' if hunter_emails_text else ''}
-    
-    <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-    
-    <div style="text-align: center; color: #6c757d; font-size: 12px;">
-        <p><strong>Generated by AI Lead Enrichment Stack</strong></p>
-        <p>🤖 Powered by ChatGPT + Multiple APIs</p>
-        <p>PeopleDataLabs • Apollo.io • Hunter.io • SERP API</p>
-    </div>
-</body>
-</html>
-"""
+                email_subject, email_body = render_lead_report(lead_data, name=name, company=company)
                 
                 # Show sending status
                 with st.spinner("📧 Sending email..."):
@@ -256,11 +350,116 @@ if enrich_button and name:
             else:
                 st.error("❌ Please enter a valid email address to send the report.")
 
-elif enrich_button and not name:
-    st.error("❌ Please enter a name to enrich the lead.")
+if active_view == "batch":
+    batch_run = st.session_state["batch_run"]
+    accepted_leads, rejected_leads, report = batch_run["accepted"], batch_run["rejected"], batch_run["report"]
+    batch_results, export_format = batch_run["results"], batch_run["export_format"]
+    st.header("📦 Batch Enrichment")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Rows Uploaded", report["total_rows"])
+    with col2:
+        st.metric("Leads Accepted", report["accepted_rows"])
+    with col3:
+        st.metric("Duplicates Removed", report["duplicates_removed"])
+    with col4:
+        st.metric("Rejected", report["rejected_missing_name"] + report["rejected_junk_name"])
+    
+    with st.expander("🧹 Pre-validation Report"):
+        st.write(f"• **Malformed emails cleared:** {report['invalid_emails_cleared']}")
+        st.write(f"• **Malformed domains cleared:** {report['invalid_domains_cleared']}")
+        st.write(f"• **Free-mail domains cleared:** {report['free_mail_domains_cleared']}")
+        st.write(f"• **Domains derived from email:** {report['domains_derived_from_email']}")
+        if not rejected_leads.empty:
+            st.dataframe(rejected_leads, use_container_width=True, hide_index=True)
+    
+    if accepted_leads.empty:
+        st.warning("⚠️ No valid leads to enrich in this file.")
+    else:
+        failed = sum(1 for result in batch_results if "error" in result and "ai_analysis" not in result)
+        st.success(f"✅ Batch completed: {len(batch_results) - failed} enriched, {failed} failed")
+        
+        st.dataframe(
+            [
+                {
+                    "Name": result.get("lead_name", lead["name"]),
+                    "Company": result.get("company_name") or lead["company"],
+                    "Hunter Emails": len(result.get("hunter_emails", [])),
+                    "Model": result.get("model_routing", {}).get("model", "N/A"),
+                    "Status": "❌ " + result["error"] if "error" in result else "✅ Enriched",
+                }
+                for lead, result in zip(accepted_leads.to_dict("records"), batch_results)
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Columnar exports written while the batch ran
+        st.subheader("💾 Export")
+        export_mime = "application/vnd.apache.parquet" if export_format == "parquet" else "text/csv"
+        col1, col2 = st.columns(2)
+        for column, (table, path) in zip((col1, col2), batch_run["export_paths"].items()):
+            with column:
+                with open(path, "rb") as export_file:
+                    st.download_button(f"⬇️ Download {table.replace('_', ' ')} ({export_format})", export_file.read(),
+                                       file_name=os.path.basename(path), mime=export_mime,
+                                       use_container_width=True)
+        st.caption(f"Saved to {batch_run['export_directory']}")
+        
+        # One digest email for the whole batch instead of one report per lead
+        st.subheader("📧 Send Batch Digest")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            digest_recipient = st.text_input("📧 Enter email address to send the digest:",
+                                             placeholder="your@email.com",
+                                             key="digest_recipient")
+        with col2:
+            st.write("")  # Empty space for alignment
+            st.write("")  # Empty space for alignment
+            send_digest_button = st.button("📧 Send Digest", type="primary", use_container_width=True)
+        
+        if send_digest_button:
+            if digest_recipient and digest_recipient.strip():
+                digest_subject, digest_body = render_digest(batch_results, accepted_leads.to_dict("records"))
+                with st.spinner("📧 Sending digest..."):
+                    result = send_email_with_gmail(digest_recipient, digest_subject, digest_body)
+                if result is True:
+                    st.success(f"✅ Digest covering {len(batch_results)} leads sent!")
+                else:
+                    st.error(f"❌ Email failed: {result}")
+            else:
+                st.error("❌ Please enter a valid email address to send the digest.")
+
+def _open_stored_enrichment(enrichment_id):
+    """Show a stored enrichment as the current lead (emailing/exporting it needs no API calls)"""
+    stored = get_enrichment(enrichment_id)
+    if stored:
+        st.session_state["lead_result"] = {
+            "inputs": {"name": stored.get("lead_name", ""), "email": None, "company": stored.get("company_name"),
+                       "domain": None, "priority": stored.get("model_routing", {}).get("priority", "normal")},
+            "data": stored,
+        }
+        st.session_state["active_view"] = "lead"
+
+# Search over past enrichments (local full-text index)
+if active_view == "search":
+    matches = search_enrichments(search_query)
+    st.header(f"🔎 {len(matches)} past enrichment(s) matching \"{search_query}\"")
+    for match in matches:
+        enriched_at = datetime.fromtimestamp(match["enriched_at"]).strftime("%Y-%m-%d %H:%M")
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**{match['lead_name']}** - {match['title'] or 'N/A'} @ {match['company_name'] or 'N/A'} · _{enriched_at}_")
+            if match["snippet"]:
+                st.caption(match["snippet"])
+        with col2:
+            st.button("📄 Open", key=f"view_enrichment_{match['id']}", use_container_width=True,
+                      on_click=_open_stored_enrichment, args=(match["id"],))
+        st.markdown("---")
 
 # Instructions
-if not enrich_button:
+if active_view is None:
     st.markdown("---")
     st.header("🚀 How It Works")
     
@@ -316,6 +515,35 @@ if not enrich_button:
         - LinkedIn profile links
         """)
 
+# Hot spots of the last profiled run
+last_profile = st.session_state.get("last_profile")
+if profile_runs and last_profile:
+    st.markdown("---")
+    with st.expander(f"🔬 Profile: {last_profile['label']} ({last_profile['duration_seconds']}s)"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Samples", last_profile["samples"])
+        with col2:
+            st.metric("On-CPU", last_profile["cpu_samples"])
+        with col3:
+            st.metric("Waiting (network/locks)", last_profile["waiting_samples"])
+        
+        st.subheader("🔥 Top CPU Sites")
+        st.dataframe(last_profile["top_cpu_sites"], use_container_width=True, hide_index=True,
+                     column_config={"share": st.column_config.ProgressColumn("Share", min_value=0, max_value=1)})
+        st.subheader("🧩 Project Functions (inclusive CPU)")
+        st.dataframe(last_profile["top_functions"], use_container_width=True, hide_index=True,
+                     column_config={"share": st.column_config.ProgressColumn("Share", min_value=0, max_value=1)})
+        if last_profile["top_allocation_sites"]:
+            st.subheader(f"💾 Top Allocation Sites (peak {last_profile['peak_traced_kb']:,} KB)")
+            st.dataframe(last_profile["top_allocation_sites"], use_container_width=True, hide_index=True)
+        
+        if os.path.exists(last_profile["files"]["flamegraph"]):
+            with open(last_profile["files"]["flamegraph"], "rb") as flamegraph_file:
+                st.download_button("⬇️ Download Flamegraph (SVG)", flamegraph_file.read(),
+                                   file_name=os.path.basename(last_profile["files"]["flamegraph"]), mime="image/svg+xml")
+        st.caption(f"Saved to {os.path.dirname(last_profile['files']['summary'])}")
+
 # Footer
 st.markdown("---")
 st.markdown("**🤖 Powered by ChatGPT** | Integrates PeopleDataLabs, Apollo, Hunter.io, SERP API") 
\ No newline at end of file
@@ -1,12 +1,17 @@
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError, APIStatusError
 import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 import json
 import streamlit as st
 import logging
+import time
+from metering import record_openai_usage
+from circuit_breaker import get_breaker, QUOTA_STATUS_CODES
+from scheduler import scheduled, defer_rate_limit
+from model_router import choose_model, usage_summary, SMALL_MODEL, LARGE_MODEL
 
 # Load OpenAI API key from environment variable or Streamlit secrets
 try:
@@ -182,12 +187,95 @@ Found Emails:
     
     return "\n".join(extracted_info)
 
-def ai_analyze_and_structure_lead_data(all_api_data: Dict[str, Any], lead_name: str, company_name: str = "") -> Dict[str, Any]:
+def _chat_completion(model: str, messages: list, **kwargs):
     """
-    Pass essential API data through ChatGPT for intelligent analysis and let ChatGPT decide the structure
+    Create a chat completion through the OpenAI circuit breaker and meter its tokens.
+    Returns (response, usage summary or None). Waits for an OpenAI scheduler slot first.
+    Like the HTTP providers, only connection errors/timeouts, 5xx and quota statuses count against the
+    circuit - a 400 (e.g. context_length_exceeded) is a problem with this request, not with OpenAI.
+    """
+    breaker = get_breaker("openai")
+    trial = breaker.before_call()
+    try:
+        with scheduled("openai"):
+            started = time.time()
+            response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+    except APIConnectionError as e:  # Includes APITimeoutError
+        breaker.record_failure(f"{type(e).__name__}: {e}")
+        raise
+    except APIStatusError as e:
+        if e.status_code == 429 and defer_rate_limit("openai", e.response.headers):
+            pass  # Batch traffic backs off in the scheduler; interactive lookups keep the circuit closed
+        elif e.status_code in QUOTA_STATUS_CODES or e.status_code >= 500:
+            breaker.record_failure(f"{type(e).__name__}: {e}", quota=e.status_code in QUOTA_STATUS_CODES)
+        else:
+            breaker.record_success()
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        breaker.end_trial(trial)
+
+    usage = None
+    if response.usage:
+        usage = usage_summary(model, response.usage)
+        record_openai_usage(usage, (time.time() - started) * 1000)
+    return response, usage
+
+def ai_summarize_company(company_name: str, domain: str, company_api_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Generate a reusable company summary from company-scoped API data (Hunter.io + news search).
+    Without an OpenAI client the extracted raw data is returned; None means the ChatGPT call failed.
+    """
+    company_data = extract_key_data_from_apis(company_api_data)
+    if not client:
+        return company_data
+
+    prompt = f"""
+You are a sales intelligence analyst. Summarize the company {company_name or domain} {f"({domain})" if domain else ""} for a sales team.
+
+Here's the data I collected:
+
+{company_data}
+
+Cover in under 250 words: what the company does, industry and size signals, email pattern and key contacts,
+recent news, and likely business priorities. Use short bullet points.
+"""
+    try:
+        response, _ = _chat_completion(
+            SMALL_MODEL,
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=600
+        )
+        return response.choices[0].message.content or None
+    except Exception as e:
+        print(f"Error in company summary: {e}")
+        return None
+
+def person_scoped_api_data(all_api_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop company-scoped entries (shared via the company profile) from the per-person API data"""
+    person_data = {key: value for key, value in all_api_data.items() if key != "hunter"}
+    if "google_searches" in all_api_data:
+        person_data["google_searches"] = {
+            query_key: search_data
+            for query_key, search_data in all_api_data["google_searches"].items()
+            if not (isinstance(search_data, dict) and search_data.get("scope") == "company")
+        }
+    return person_data
+
+def ai_analyze_and_structure_lead_data(all_api_data: Dict[str, Any], lead_name: str, company_name: str = "", priority: str = "normal", company_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Pass essential API data through ChatGPT for intelligent analysis and let ChatGPT decide the structure.
+    The model is picked by the model router based on data richness and lead priority.
+    When a shared company profile is given, the prompt carries its summary plus person-specific data only.
     """
     # Extract only key data to avoid token limits
-    essential_data = extract_key_data_from_apis(all_api_data)
+    if company_profile:
+        essential_data = extract_key_data_from_apis(person_scoped_api_data(all_api_data))
+        essential_data += f"\n\nCompany Profile ({company_profile.get('key', 'N/A')}):\n{company_profile.get('summary') or 'N/A'}\n"
+    else:
+        essential_data = extract_key_data_from_apis(all_api_data)
     
     # Extract Hunter.io emails for separate display
     hunter_emails = []
@@ -233,6 +321,8 @@ Feel free to make intelligent inferences based on the data and your knowledge. P
 Make your analysis detailed, practical, and engaging. Use emojis and formatting to make it easy to read. Don't worry about JSON format - just provide the best possible analysis in whatever structure works best.
 """
 
+    routing = choose_model(all_api_data, priority)
+
     try:
         if not client:
             return {
@@ -241,17 +331,21 @@ Make your analysis detailed, practical, and engaging. Use emojis and formatting
                 "lead_name": lead_name,
                 "company_name": company_name,
                 "hunter_emails": hunter_emails,
+                "model_routing": routing,
                 "raw_api_data": all_api_data
             }
             
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
+        print(f"🧭 Model router: {routing['model']} ({routing['reason']}, richness {routing['richness_score']})")
+        response, usage = _chat_completion(
+            routing["model"],
+            [{"role": "user", "content": prompt}],
             temperature=0.7,  # Higher temperature for more creative insights
             max_tokens=3000  # Limit response to avoid issues
         )
         
         analysis_content = response.choices[0].message.content or "No analysis generated"
+        if usage:
+            routing["usage"] = usage
         
         # Return in a simple structure
         return {
@@ -260,6 +354,7 @@ Make your analysis detailed, practical, and engaging. Use emojis and formatting
             "company_name": company_name,
             "data_sources": list(all_api_data.keys()),
             "hunter_emails": hunter_emails,  # Separate Hunter.io emails
+            "model_routing": routing,
             "raw_api_data": all_api_data
         }
         
@@ -271,10 +366,11 @@ Make your analysis detailed, practical, and engaging. Use emojis and formatting
             "lead_name": lead_name,
             "company_name": company_name,
             "hunter_emails": hunter_emails,
+            "model_routing": routing,
             "raw_api_data": all_api_data
         }
 
-def fill_missing_info_with_ai(input_data):
+def fill_missing_info_with_ai(input_data, priority="normal"):
     if not client:
         return json.dumps({"error": "OpenAI client not available"})
         
@@ -284,10 +380,9 @@ def fill_missing_info_with_ai(input_data):
     
     Return as JSON with keys: name, email, company, LinkedIn, Twitter, website.
     """
-    res = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}]
-    )
+    # Filling a handful of fields is routine extraction - only high-priority leads need the large model
+    model = LARGE_MODEL if priority == "high" else SMALL_MODEL
+    res, _ = _chat_completion(model, [{"role": "user", "content": prompt}])
     return res.choices[0].message.content
 
 def send_email_with_gmail(recipient: str, subject: str, body: str) -> Union[bool, str]: